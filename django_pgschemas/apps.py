@@ -13,8 +13,11 @@ class AppConfig(BaseAppConfig):
             ensure_overall_schemas,
         )
         from .routing import middleware as _routing_middleware  # noqa: F401
+        from .routing.index import build_static_routing_index
 
         ensure_tenant_dict()
         ensure_public_schema()
         ensure_default_schemas()
         ensure_overall_schemas()
+
+        build_static_routing_index()
@@ -9,6 +9,7 @@ from django.db import connection
 from django.db.utils import ProgrammingError
 from django.utils.module_loading import import_module
 
+from django_pgschemas.routing.index import is_wildcard_domain
 from django_pgschemas.settings import get_extra_search_paths
 from django_pgschemas.utils import (
     get_clone_reference,
@@ -92,7 +93,13 @@ def ensure_default_schemas() -> None:
     if "URLCONF" not in tenants_default:
         raise ImproperlyConfigured("TENANTS['default'] must contain a 'URLCONF' key.")
     if "DOMAINS" in tenants_default:
-        raise ImproperlyConfigured("TENANTS['default'] cannot contain a 'DOMAINS' key.")
+        domains = tenants_default["DOMAINS"]
+        if not isinstance(domains, (list, tuple)):
+            raise ImproperlyConfigured("TENANTS['default'] cannot contain a 'DOMAINS' key.")
+        if not all(is_wildcard_domain(domain) for domain in domains):
+            raise ImproperlyConfigured(
+                "TENANTS['default']['DOMAINS'] can only contain wildcard domains."
+            )
     if "SESSION_KEY" in tenants_default:
         raise ImproperlyConfigured("TENANTS['default'] cannot contain a 'SESSION_KEY' key.")
     if "HEADER" in tenants_default:
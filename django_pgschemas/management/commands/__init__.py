@@ -1,4 +1,7 @@
 import enum
+import functools
+import inspect
+import operator
 from typing import Any, Callable, Self
 
 from django.conf import settings
@@ -7,10 +10,17 @@ from django.db.models import Case, CharField, Q, Value, When
 from django.db.models.functions import Concat
 from django.db.utils import ProgrammingError
 
-from django_pgschemas.management.commands._executors import parallel, sequential
+from django_pgschemas.management.commands._executors import (  # noqa: F401
+    aget_schema_connection,
+    asynchronous,
+    parallel,
+    process,
+    sequential,
+)
 from django_pgschemas.schema import Schema, get_current_schema
 from django_pgschemas.utils import (
-    create_schema,
+    chunked,
+    create_schemas,
     dynamic_models_exist,
     get_clone_reference,
     get_domain_model,
@@ -35,9 +45,23 @@ class CommandScope(enum.Enum):
 EXECUTORS = {
     "sequential": sequential,
     "parallel": parallel,
+    "process": process,
+    "asyncio": asynchronous,
 }
 
 
+def read_schema_file(path: str | None) -> list[str]:
+    "Returns the schema references in the file `path`, skipping blank lines and comments."
+    if not path:
+        return []
+    try:
+        with open(path) as schema_file:
+            lines = [line.strip() for line in schema_file]
+    except OSError as e:
+        raise CommandError(f"Unable to read schema file '{path}': {e.strerror}")
+    return [line for line in lines if line and not line.startswith("#")]
+
+
 class WrappedSchemaOption:
     scope = CommandScope.ALL
     specific_schemas = None
@@ -61,6 +85,11 @@ class WrappedSchemaOption:
             dest="schemas",
             help="Schema(s) to execute the current command",
         )
+        parser.add_argument(
+            "--schema-file",
+            dest="schema_file",
+            help="File with schema(s) to execute the current command, one per line",
+        )
         parser.add_argument(
             "-x",
             "--exclude-schema",
@@ -105,6 +134,12 @@ class WrappedSchemaOption:
             action="store_true",
             help="Run command in parallel mode",
         )
+        parser.add_argument(
+            "--executor",
+            dest="executor",
+            choices=list(EXECUTORS),
+            help="Executor to run the command with, takes precedence over --parallel",
+        )
         parser.add_argument(
             "--no-create-schemas",
             dest="skip_schema_creation",
@@ -128,18 +163,30 @@ class WrappedSchemaOption:
             if not schemas:
                 raise CommandError("This command can only run in %s" % self.specific_schemas)
         if not skip_schema_creation:
-            for schema in schemas:
-                create_schema(schema, check_if_exists=True, sync_schema=False, verbosity=0)
+            create_schemas(schemas, check_if_exists=True)
         return schemas
 
     def get_executor_from_options(self, **options: Any) -> Callable[..., list[str]]:
-        return EXECUTORS["parallel"] if options.get("parallel") else EXECUTORS["sequential"]
+        is_async = inspect.iscoroutinefunction(getattr(self, "handle_schema", None))
+
+        if not (executor := options.get("executor")):
+            if is_async:
+                executor = "asyncio"
+            else:
+                executor = "parallel" if options.get("parallel") else "sequential"
+
+        if is_async and executor != "asyncio":
+            raise CommandError("Commands with an async handle_schema need the asyncio executor")
+        if not is_async and executor == "asyncio":
+            raise CommandError("The asyncio executor needs a command with an async handle_schema")
+
+        return EXECUTORS[executor]
 
     def get_scope_display(self) -> str:
         return "|".join(self.specific_schemas or []) or self.scope.value
 
     def _get_schemas_from_options(self, **options: Any) -> list[str]:
-        schemas = options.get("schemas") or []
+        schemas = [*(options.get("schemas") or []), *read_schema_file(options.get("schema_file"))]
         excluded_schemas = options.get("excluded_schemas") or []
         include_all_schemas = options.get("all_schemas") or False
         include_static_schemas = options.get("static_schemas") or False
@@ -207,19 +254,63 @@ class WrappedSchemaOption:
             if clone_reference:
                 schemas_to_return.add(clone_reference)
 
-        def find_schema_by_reference(reference: str, as_excluded: bool = False) -> str:
-            if reference in settings.TENANTS and reference != "default" and allow_static:
-                return reference
-            elif reference == clone_reference:
-                return reference
-            elif (
-                TenantModel is not None
+        def resolve_references(references: list[str]) -> dict[str, list[str]]:
+            """
+            Resolves all `references` together, to the schemas each one matches.
+            Dynamic tenants are looked up with a query for exact matches, and
+            another one for domain prefix matches, per chunk of references.
+            """
+            resolved: dict[str, list[str]] = {}
+
+            for reference in references:
+                if reference in settings.TENANTS and reference != "default" and allow_static:
+                    resolved[reference] = [reference]
+                elif reference == clone_reference:
+                    resolved[reference] = [reference]
+
+            pending = [reference for reference in references if reference not in resolved]
+
+            if pending and TenantModel is not None and dynamic_ready and allow_dynamic:
+                for chunk in chunked(pending):
+                    for schema_name in TenantModel.objects.filter(
+                        schema_name__in=chunk
+                    ).values_list("schema_name", flat=True):
+                        resolved[schema_name] = [schema_name]
+                pending = [reference for reference in pending if reference not in resolved]
+
+            routes: list[tuple[str, str]] = []
+
+            if (
+                pending
+                and TenantModel is not None
                 and dynamic_ready
-                and TenantModel.objects.filter(schema_name=reference).exists()
                 and allow_dynamic
+                and has_domains
             ):
-                return reference
-            else:
+                annotated = TenantModel.objects.annotate(
+                    route=Case(
+                        When(
+                            domains__folder="",
+                            then="domains__domain",
+                        ),
+                        default=Concat(
+                            "domains__domain",
+                            Value("/"),
+                            "domains__folder",
+                            output_field=CharField(),
+                        ),
+                        output_field=CharField(),
+                    )
+                )
+                for chunk in chunked(pending):
+                    routes += annotated.filter(
+                        functools.reduce(
+                            operator.or_,
+                            [Q(route__startswith=reference) for reference in chunk],
+                        )
+                    ).values_list("schema_name", "route")
+
+            for reference in pending:
                 local = []
                 if allow_static:
                     local += [
@@ -228,45 +319,33 @@ class WrappedSchemaOption:
                         if schema_name not in ["public", "default"]
                         and any(x for x in data.get("DOMAINS", []) if x.startswith(reference))
                     ]
-                if TenantModel is not None and dynamic_ready and allow_dynamic:
-                    local += (
-                        TenantModel.objects.annotate(
-                            route=Case(
-                                When(
-                                    domains__folder="",
-                                    then="domains__domain",
-                                ),
-                                default=Concat(
-                                    "domains__domain",
-                                    Value("/"),
-                                    "domains__folder",
-                                    output_field=CharField(),
-                                ),
-                                output_field=CharField(),
-                            )
-                            if has_domains
-                            else Value("")
-                        )
-                        .filter(Q(schema_name=reference) | Q(route__startswith=reference))
-                        .distinct()
-                        .values_list("schema_name", flat=True)
-                    )
-                if not local:
-                    message = (
-                        "No schema found for '%s' (excluded)"
-                        if as_excluded
-                        else "No schema found for '%s'"
-                    )
-                    raise CommandError(message % reference)
-                if len(local) > 1:
-                    message = (
-                        "More than one tenant found for schema '%s' by domain (excluded), "
-                        "please, narrow down the filter"
-                        if as_excluded
-                        else "More than one tenant found for schema '%s' by domain, please, narrow down the filter"
-                    )
-                    raise CommandError(message % reference)
-                return local[0]
+                local += [
+                    schema_name for schema_name, route in routes if route.startswith(reference)
+                ]
+                resolved[reference] = list(dict.fromkeys(local))
+
+            return resolved
+
+        resolved_references = resolve_references(list(dict.fromkeys(schemas + excluded_schemas)))
+
+        def find_schema_by_reference(reference: str, as_excluded: bool = False) -> str:
+            local = resolved_references[reference]
+            if not local:
+                message = (
+                    "No schema found for '%s' (excluded)"
+                    if as_excluded
+                    else "No schema found for '%s'"
+                )
+                raise CommandError(message % reference)
+            if len(local) > 1:
+                message = (
+                    "More than one tenant found for schema '%s' by domain (excluded), "
+                    "please, narrow down the filter"
+                    if as_excluded
+                    else "More than one tenant found for schema '%s' by domain, please, narrow down the filter"
+                )
+                raise CommandError(message % reference)
+            return local[0]
 
         for schema in schemas:
             included = find_schema_by_reference(schema, as_excluded=False)
@@ -289,9 +368,10 @@ class SchemaCommand(WrappedSchemaOption, BaseCommand):
         executor = self.get_executor_from_options(**options)
         executor(schemas, self, "_raw_handle_schema", args, options, pass_schema_in_kwargs=True)
 
-    def _raw_handle_schema(self, *args: Any, **kwargs: Any) -> None:
+    def _raw_handle_schema(self, *args: Any, **kwargs: Any) -> Any:
         kwargs.pop("schema_name")
-        self.handle_schema(get_current_schema(), *args, **kwargs)
+        # Returns the coroutine of an async handle_schema for the asyncio executor
+        return self.handle_schema(get_current_schema(), *args, **kwargs)
 
     def handle_schema(self, schema: Schema, *args: Any, **options: Any) -> None:
         raise NotImplementedError
@@ -1,34 +1,70 @@
+import asyncio
 import functools
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import inspect
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextvars import ContextVar
 from typing import Any
 
+import django
+from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
 from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError, OutputWrapper
 from django.db import connections
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
 from django.db.utils import ProgrammingError
 
+from django_pgschemas.postgresql.base import get_search_path, get_set_search_path_sql
 from django_pgschemas.routing.info import DomainInfo
-from django_pgschemas.routing.models import get_primary_domain_for_tenant
+from django_pgschemas.routing.models import (
+    get_primary_domain_for_tenant,
+    get_primary_domains_for_schemas,
+)
 from django_pgschemas.schema import Schema, activate
-from django_pgschemas.settings import get_parallel_max_workers
-from django_pgschemas.utils import get_clone_reference, get_tenant_model
+from django_pgschemas.settings import (
+    get_parallel_max_workers,
+    get_tenant_db_alias,
+    get_transaction_pooling,
+)
+from django_pgschemas.utils import chunked, get_clone_reference, get_tenant_model
 
 
-def run_on_schema(
-    schema_name: str,
-    executor_codename: str,
-    command: BaseCommand | type[BaseCommand],
-    function_name: str | None = None,
-    args: list[Any] | None = None,
-    kwargs: dict[str, Any] | None = None,
-    pass_schema_in_kwargs: bool = False,
-) -> str:
-    if args is None:
-        args = []
-    if kwargs is None:
-        kwargs = {}
+class StyleFunc:
+    """
+    Prepends output with the executor and schema name.
+    """
+
+    # Since we are prepending every output with the schema_name and executor, we need to determine
+    # whether we need to do so based on the last ending used to write. If the last write didn't end
+    # in '\n' then we don't do the prefixing in order to keep the output looking good.
+    last_message: str | None = None
+
+    def __init__(self, command: BaseCommand, executor_codename: str, schema_name: str) -> None:
+        self.command = command
+        self.executor_codename = executor_codename
+        self.schema_name = schema_name
 
+    def __call__(self, message: str) -> str:
+        last_message = self.last_message
+        self.last_message = message
+        if last_message is None or last_message.endswith("\n"):
+            return "[%s:%s] %s" % (
+                self.command.style.NOTICE(self.executor_codename),
+                self.command.style.NOTICE(self.schema_name),
+                message,
+            )
+        return message
+
+
+def prepare_command(
+    command: BaseCommand | type[BaseCommand],
+    kwargs: dict[str, Any],
+    executor_codename: str,
+    schema_name: str,
+) -> BaseCommand:
     if not isinstance(command, BaseCommand):
         # Parallel executor needs to pass command 'type' instead of 'instance'
         # Therefore, no customizations for the command can be done, nor using custom stdout, stderr
@@ -42,44 +78,51 @@ def run_on_schema(
     if not isinstance(command.stderr, OutputWrapper):
         command.stderr = OutputWrapper(command.stderr)
 
-    # Since we are prepending every output with the schema_name and executor, we need to determine
-    # whether we need to do so based on the last ending used to write. If the last write didn't end
-    # in '\n' then we don't do the prefixing in order to keep the output looking good.
-    class StyleFunc:
-        last_message: str | None = None
-
-        def __call__(self, message: str) -> str:
-            last_message = self.last_message
-            self.last_message = message
-            if last_message is None or last_message.endswith("\n"):
-                return "[%s:%s] %s" % (
-                    command.style.NOTICE(executor_codename),
-                    command.style.NOTICE(schema_name),
-                    message,
-                )
-            return message
+    command.stdout.style_func = StyleFunc(command, executor_codename, schema_name)
+    command.stderr.style_func = StyleFunc(command, executor_codename, schema_name)
 
-    command.stdout.style_func = StyleFunc()
-    command.stderr.style_func = StyleFunc()
+    return command
 
+
+def get_schema_to_run(schema_name: str) -> Schema:
     if schema_name in settings.TENANTS:
         domains = settings.TENANTS[schema_name].get("DOMAINS", [])
-        schema = Schema.create(
+        return Schema.create(
             schema_name=schema_name,
             routing=DomainInfo(domain=domains[0]) if domains else None,
         )
-    elif schema_name == get_clone_reference():
-        schema = Schema.create(schema_name=schema_name)
-    elif (TenantModel := get_tenant_model()) is not None:
+    if schema_name == get_clone_reference():
+        return Schema.create(schema_name=schema_name)
+    if (TenantModel := get_tenant_model()) is not None:
         try:
             schema = TenantModel.objects.get(schema_name=schema_name)
             if (domain := get_primary_domain_for_tenant(schema)) is not None:
                 schema.routing = DomainInfo(domain=domain.domain, folder=domain.folder)
+            return schema
         except ProgrammingError:
-            schema = Schema.create(schema_name=schema_name)
+            return Schema.create(schema_name=schema_name)
 
-    else:
-        raise CommandError(f"Unable to find schema {schema_name}!")
+    raise CommandError(f"Unable to find schema {schema_name}!")
+
+
+def run_on_schema(
+    schema_name: str,
+    executor_codename: str,
+    command: BaseCommand | type[BaseCommand],
+    function_name: str | None = None,
+    args: list[Any] | None = None,
+    kwargs: dict[str, Any] | None = None,
+    pass_schema_in_kwargs: bool = False,
+    prefetched: dict[str, Schema] | None = None,
+) -> str:
+    if args is None:
+        args = []
+    if kwargs is None:
+        kwargs = {}
+
+    command = prepare_command(command, kwargs, executor_codename, schema_name)
+    if prefetched is None or (schema := prefetched.get(schema_name)) is None:
+        schema = get_schema_to_run(schema_name)
 
     if pass_schema_in_kwargs:
         kwargs.update({"schema_name": schema_name})
@@ -98,6 +141,43 @@ def run_on_schema(
     return schema_name
 
 
+def prefetch_schemas(schema_names: list[str]) -> dict[str, Schema]:
+    """
+    Resolves the schemas in `schema_names` up front. Dynamic tenants and their
+    primary domains are fetched with a query each per chunk of schema names.
+    Schemas that can't be resolved this way are left out, and resolved one by
+    one when run.
+    """
+    clone_reference = get_clone_reference()
+    schemas = {
+        schema_name: get_schema_to_run(schema_name)
+        for schema_name in schema_names
+        if schema_name in settings.TENANTS or schema_name == clone_reference
+    }
+
+    if (TenantModel := get_tenant_model()) is None or not (
+        dynamic_schema_names := [name for name in schema_names if name not in schemas]
+    ):
+        return schemas
+
+    try:
+        tenants = {
+            tenant.schema_name: tenant
+            for chunk in chunked(dynamic_schema_names)
+            for tenant in TenantModel.objects.filter(schema_name__in=chunk)
+        }
+        primary_domains = get_primary_domains_for_schemas(tenants)
+    except ProgrammingError:
+        return schemas
+
+    for schema_name, tenant in tenants.items():
+        if (domain := primary_domains.get(schema_name)) is not None:
+            tenant.routing = DomainInfo(domain=domain.domain, folder=domain.folder)
+        schemas[schema_name] = tenant
+
+    return schemas
+
+
 def sequential(
     schemas: list[str],
     command: BaseCommand | type[BaseCommand],
@@ -114,6 +194,7 @@ def sequential(
         args=args,
         kwargs=kwargs,
         pass_schema_in_kwargs=pass_schema_in_kwargs,
+        prefetched=prefetch_schemas(schemas),
     )
 
     for schema in schemas:
@@ -139,6 +220,7 @@ def parallel(
         args=args,
         kwargs=kwargs,
         pass_schema_in_kwargs=pass_schema_in_kwargs,
+        prefetched=prefetch_schemas(schemas),
     )
 
     def run(schema_name: str) -> str:
@@ -160,6 +242,290 @@ def parallel(
             except Exception as exc:
                 errors.append((schema, exc))
 
+    raise_for_errors(errors)
+
+    return schemas
+
+
+class RecordedStream:
+    """
+    Output stream that records what is written to it, tagged with `name`.
+    """
+
+    def __init__(self, name: str, records: list[tuple[str, str]]) -> None:
+        self.name = name
+        self.records = records
+
+    def write(self, message: str) -> None:
+        self.records.append((self.name, message))
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def run_on_schema_in_process(
+    databases: dict[str, dict[str, Any]],
+    schema_name: str,
+    command: type[BaseCommand],
+    function_name: str,
+    args: list[Any] | None,
+    kwargs: dict[str, Any] | None,
+    pass_schema_in_kwargs: bool,
+    schema: Schema | None,
+) -> tuple[list[tuple[str, str]], Exception | None]:
+    """
+    Runs the command on `schema_name` in a worker process. Returns the
+    recorded output and the error raised, if any, for the parent process.
+    """
+    # Database settings of the parent process may point to a test database
+    for alias, settings_dict in databases.items():
+        connections[alias].settings_dict.update(settings_dict)
+
+    records: list[tuple[str, str]] = []
+    error: Exception | None = None
+
+    try:
+        run_on_schema(
+            schema_name,
+            executor_codename="process",
+            command=command,
+            function_name=function_name,
+            args=args,
+            kwargs={
+                **(kwargs or {}),
+                "stdout": RecordedStream("stdout", records),
+                "stderr": RecordedStream("stderr", records),
+            },
+            pass_schema_in_kwargs=pass_schema_in_kwargs,
+            prefetched=None if schema is None else {schema_name: schema},
+        )
+    except Exception as exc:
+        error = exc
+        try:
+            pickle.dumps(error)
+        except Exception:
+            error = CommandError(f"{type(exc).__name__}: {exc}")
+
+    return records, error
+
+
+def process(
+    schemas: list[str],
+    command: BaseCommand | type[BaseCommand],
+    function_name: str,
+    args: list[Any] | None = None,
+    kwargs: dict[str, Any] | None = None,
+    pass_schema_in_kwargs: bool = False,
+) -> list[str]:
+    max_workers = get_parallel_max_workers()
+    kwargs = dict(kwargs or {})
+
+    # Output of the workers is written here, as streams can't be passed to other processes
+    parent = command if isinstance(command, BaseCommand) else command()
+    streams: dict[str, OutputWrapper] = {}
+    for name in ["stdout", "stderr"]:
+        stream = kwargs.pop(name, getattr(parent, name))
+        streams[name] = stream if isinstance(stream, OutputWrapper) else OutputWrapper(stream)
+
+    prefetched = prefetch_schemas(schemas)
+    databases = {conn.alias: conn.settings_dict for conn in connections.all()}
+
+    errors: list[tuple[str, Exception]] = []
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        # Workers can't import this module before Django is set up
+        initializer=django.setup,
+    ) as executor:
+        futures = {
+            executor.submit(
+                run_on_schema_in_process,
+                databases,
+                schema,
+                type(parent),
+                function_name,
+                args,
+                kwargs,
+                pass_schema_in_kwargs,
+                prefetched.get(schema),
+            ): schema
+            for schema in schemas
+        }
+        for future in as_completed(futures):
+            schema = futures[future]
+            try:
+                records, error = future.result()
+            except Exception as exc:
+                records, error = [], exc
+
+            for wrapper in streams.values():
+                wrapper.style_func = StyleFunc(parent, "process", schema)
+            for name, message in records:
+                streams[name].write(message, ending="")
+
+            if error is not None:
+                errors.append((schema, error))
+
+    raise_for_errors(errors)
+
+    return schemas
+
+
+class AsyncSchemaConnections:
+    """
+    Async connections shared by the tasks of the asyncio executor. As they are
+    only opened by running tasks, there are never more connections than tasks
+    running at once.
+    """
+
+    def __init__(self, alias: str) -> None:
+        self.conn_params = connections[alias].get_connection_params()
+        # Django passes its own (sync) cursor classes
+        self.conn_params.pop("cursor_factory", None)
+        self.idle: list[Any] = []
+        self.opened: list[Any] = []
+
+    async def acquire(self, schema: Schema) -> Any:
+        from psycopg import AsyncConnection
+
+        if self.idle:
+            conn = self.idle.pop()
+        else:
+            # Search paths set with `SET LOCAL` need a transaction to last in
+            conn = await AsyncConnection.connect(
+                autocommit=not get_transaction_pooling(), **self.conn_params
+            )
+            self.opened.append(conn)
+
+        await conn.execute(get_set_search_path_sql(get_search_path(schema)))
+        return conn
+
+    async def release(self, conn: Any, failed: bool) -> None:
+        if not conn.autocommit:
+            await (conn.rollback() if failed else conn.commit())
+        if not conn.closed:
+            self.idle.append(conn)
+
+    async def close(self) -> None:
+        for conn in self.opened:
+            await conn.close()
+
+
+class AsyncSchemaConnectionLease:
+    """
+    Async connection of a single task of the asyncio executor, acquired
+    on first use.
+    """
+
+    def __init__(self, pool: AsyncSchemaConnections, schema: Schema) -> None:
+        self.pool = pool
+        self.schema = schema
+        self.conn: Any = None
+        self.lock = asyncio.Lock()
+
+    async def get(self) -> Any:
+        async with self.lock:
+            if self.conn is None:
+                self.conn = await self.pool.acquire(self.schema)
+        return self.conn
+
+    async def release(self, failed: bool) -> None:
+        if self.conn is not None:
+            await self.pool.release(self.conn, failed)
+
+
+_async_schema_connection: ContextVar[AsyncSchemaConnectionLease | None] = ContextVar(
+    "async_schema_connection", default=None
+)
+
+
+async def aget_schema_connection() -> Any:
+    """
+    Returns a psycopg 3 async connection with the search path of the schema
+    being handled by the asyncio executor. The connection goes back to the
+    executor when `handle_schema` returns.
+    """
+    if (lease := _async_schema_connection.get()) is None:
+        raise CommandError("Async schema connections are only available in the asyncio executor")
+    return await lease.get()
+
+
+def asynchronous(
+    schemas: list[str],
+    command: BaseCommand | type[BaseCommand],
+    function_name: str,
+    args: list[Any] | None = None,
+    kwargs: dict[str, Any] | None = None,
+    pass_schema_in_kwargs: bool = False,
+) -> list[str]:
+    if not is_psycopg3:
+        raise CommandError("The asyncio executor requires psycopg 3")
+    if function_name != "_raw_handle_schema" or not inspect.iscoroutinefunction(
+        getattr(command, "handle_schema", None)
+    ):
+        raise CommandError("The asyncio executor needs a command with an async handle_schema")
+
+    max_workers = get_parallel_max_workers() or os.cpu_count() or 1
+    kwargs = dict(kwargs or {})
+
+    # Every task gets its own command, writing to the streams of this one
+    parent = command if isinstance(command, BaseCommand) else command()
+    streams = {
+        name: stream._out if isinstance(stream, OutputWrapper) else stream
+        for name in ["stdout", "stderr"]
+        if (stream := kwargs.pop(name, getattr(parent, name)))
+    }
+    prefetched = prefetch_schemas(schemas)
+
+    async def run_all() -> list[tuple[str, Exception]]:
+        semaphore = asyncio.BoundedSemaphore(max_workers)
+        pool = AsyncSchemaConnections(get_tenant_db_alias())
+
+        async def run(schema_name: str) -> None:
+            async with semaphore:
+                if (schema := prefetched.get(schema_name)) is None:
+                    schema = await sync_to_async(get_schema_to_run)(schema_name)
+                task_command = prepare_command(type(parent)(**streams), {}, "asyncio", schema_name)
+                task_kwargs = (
+                    {**kwargs, "schema_name": schema_name} if pass_schema_in_kwargs else kwargs
+                )
+                lease = AsyncSchemaConnectionLease(pool, schema)
+
+                # Each task runs in a copy of the context, so these only apply to this task
+                activate(schema)
+                _async_schema_connection.set(lease)
+
+                failed = True
+                try:
+                    await getattr(task_command, function_name)(*(args or []), **task_kwargs)
+                    failed = False
+                finally:
+                    await lease.release(failed)
+
+        try:
+            results = await asyncio.gather(
+                *(run(schema) for schema in schemas), return_exceptions=True
+            )
+        finally:
+            await pool.close()
+
+        return [
+            (schema, result)
+            for schema, result in zip(schemas, results)
+            if isinstance(result, Exception)
+        ]
+
+    raise_for_errors(async_to_sync(run_all)())
+
+    return schemas
+
+
+def raise_for_errors(errors: list[tuple[str, Exception]]) -> None:
+    "Raises a single `CommandError` for the errors of executors that don't stop early."
     if errors:
         errors.sort(key=lambda item: item[0])
         if len(errors) == 1:
@@ -169,5 +535,3 @@ def parallel(
             ) from error
         details = "\n".join(f"  {schema}: {error}" for schema, error in errors)
         raise CommandError(f"Error while running command on {len(errors)} schemas:\n{details}")
-
-    return schemas
@@ -48,12 +48,15 @@ class Command(WrappedSchemaOption, BaseCommand):
 
             schemas = self.get_schemas_from_options(
                 schemas=schema_ns.schemas,
+                schema_file=schema_ns.schema_file,
                 all_schemas=schema_ns.all_schemas,
                 static_schemas=schema_ns.static_schemas,
                 dynamic_schemas=schema_ns.dynamic_schemas,
                 tenant_schemas=schema_ns.tenant_schemas,
             )
-            executor = self.get_executor_from_options(parallel=schema_ns.parallel)
+            executor = self.get_executor_from_options(
+                parallel=schema_ns.parallel, executor=schema_ns.executor
+            )
         except Exception as e:
             if not isinstance(e, CommandError):
                 raise
@@ -71,12 +74,14 @@ class Command(WrappedSchemaOption, BaseCommand):
         schemas = self.get_schemas_from_options(**options)
         executor = self.get_executor_from_options(**options)
         options.pop("schemas")
+        options.pop("schema_file")
         options.pop("excluded_schemas")
         options.pop("all_schemas")
         options.pop("static_schemas")
         options.pop("dynamic_schemas")
         options.pop("tenant_schemas")
         options.pop("parallel")
+        options.pop("executor")
         options.pop("skip_schema_creation")
         if self.allow_interactive:
             options.pop("interactive")
@@ -1,5 +1,8 @@
+from typing import Any, Iterable
+
 from django.db import models
 
+from django_pgschemas.routing.cache import deferred_tenants
 from django_pgschemas.schema import Schema
 from django_pgschemas.signals import (
     dynamic_tenant_needs_sync,
@@ -85,6 +88,17 @@ class TenantModel(Schema, models.Model):
                 self.drop_schema()
                 raise
 
+    def refresh_from_db(
+        self, using: str | None = None, fields: Iterable[str] | None = None, **kwargs: Any
+    ) -> None:
+        if getattr(self, "_deferred_by_routing", False):
+            # Accessing one field deferred by routing loads them all at once
+            del self._deferred_by_routing
+            deferred_tenants.add_loaded()
+            if fields is not None:
+                fields = {*fields, *self.get_deferred_fields()}
+        super().refresh_from_db(using, fields, **kwargs)
+
     def delete(
         self, using: str | None = None, keep_parents: bool = False, force_drop: bool = False
     ) -> None:
@@ -1,7 +1,14 @@
-from typing import Any
+import re
+from contextlib import contextmanager, nullcontext, suppress
+from functools import lru_cache
+from typing import Any, Iterator
 
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
 from django.db.utils import DatabaseError
+from django.dispatch import receiver
 from django.utils.asyncio import async_unsafe
 
 from django_pgschemas.schema import Schema, get_current_schema, get_default_schema
@@ -10,6 +17,9 @@ from django_pgschemas.settings import (
     get_extra_search_paths,
     get_limit_set_calls,
     get_original_backend_module,
+    get_pipeline_search_path,
+    get_pool_schema_affinity,
+    get_transaction_pooling,
 )
 from django_pgschemas.utils import check_schema_name
 
@@ -29,11 +39,10 @@ except AttributeError:
     module = get_base_backend_module("base")
 
 
-def get_search_path(schema: Schema | None = None) -> str:
-    if schema is None:
-        schema = get_default_schema()
-
-    search_path = ["public"] if schema.schema_name == "public" else [schema.schema_name, "public"]
+@lru_cache(maxsize=4096)
+def build_search_path(schema_name: str) -> str:
+    "Returns the validated search path for `schema_name`."
+    search_path = ["public"] if schema_name == "public" else [schema_name, "public"]
     search_path.extend(get_extra_search_paths())
 
     for part in search_path:
@@ -42,41 +51,339 @@ def get_search_path(schema: Schema | None = None) -> str:
     return ", ".join(search_path)
 
 
+@receiver(setting_changed)
+def search_path_callback(setting: str, **kwargs: object) -> None:
+    if setting == "PGSCHEMAS_EXTRA_SEARCH_PATHS":
+        build_search_path.cache_clear()
+
+
+def get_search_path(schema: Schema | None = None) -> str:
+    if schema is None:
+        schema = get_default_schema()
+
+    return build_search_path(schema.schema_name)
+
+
+def get_set_search_path_sql(search_path: str) -> str:
+    if get_transaction_pooling():
+        return f"SET LOCAL search_path = {search_path}"
+    return f"SET search_path = {search_path}"
+
+
+PIPELINE_STATEMENT_RE = re.compile(r"\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", re.IGNORECASE)
+
+TRANSACTION_CONTROL_STATEMENT_RE = re.compile(
+    r"\s*(BEGIN|START|COMMIT|END|ROLLBACK|ABORT|SAVEPOINT|RELEASE|PREPARE)\b", re.IGNORECASE
+)
+
+NON_TRANSACTIONAL_STATEMENT_RE = re.compile(
+    r"\s*(VACUUM|(CREATE|DROP)\s+(DATABASE|TABLESPACE)|ALTER\s+SYSTEM"
+    r"|(CREATE|DROP|REINDEX)\b.*\bCONCURRENTLY)\b",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def can_pipeline_search_path() -> bool:
+    return get_pipeline_search_path() and is_psycopg3 and _psycopg.Pipeline.is_supported()
+
+
+class PipelinedSearchPathCursor:
+    """
+    Wraps a psycopg 3 cursor so that setting the search path is sent in the
+    same pipeline, and therefore the same round trip, as its first query.
+    """
+
+    def __init__(self, cursor: Any, db: "DatabaseWrapper", search_path: str) -> None:
+        self.cursor = cursor
+        self.db = db
+        self.search_path: str | None = search_path
+
+    def _flush(self) -> None:
+        search_path, self.search_path = self.search_path, None
+
+        if search_path is not None:
+            try:
+                with self.db.connection.cursor() as cursor:
+                    cursor.execute(get_set_search_path_sql(search_path))
+            except (DatabaseError, _psycopg.InternalError):
+                self.db._search_path = None
+            else:
+                self.db._search_path = search_path
+
+    def _pipelined(self, method: str, query: Any, *args: Any, **kwargs: Any) -> Any:
+        # Some statements (e.g. CREATE DATABASE) cannot run inside a pipeline
+        if not (isinstance(query, str) and PIPELINE_STATEMENT_RE.match(query)):
+            self._flush()
+
+        search_path, self.search_path = self.search_path, None
+
+        if search_path is None:
+            return getattr(self.cursor, method)(query, *args, **kwargs)
+
+        with self.db.connection.cursor() as cursor:
+            try:
+                with self.db.connection.pipeline():
+                    cursor.execute(get_set_search_path_sql(search_path))
+                    result = getattr(self.cursor, method)(query, *args, **kwargs)
+            except BaseException:
+                # In autocommit, the failed query rolls back the implicit
+                # transaction it shares with setting the search path
+                if self.db.get_autocommit():
+                    self.db._search_path = None
+                else:
+                    self.db._search_path = search_path if cursor.statusmessage == "SET" else None
+                raise
+
+        self.db._search_path = search_path
+        return result
+
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        return self._pipelined("execute", *args, **kwargs)
+
+    def executemany(self, *args: Any, **kwargs: Any) -> Any:
+        return self._pipelined("executemany", *args, **kwargs)
+
+    def close(self) -> None:
+        self.search_path = None
+        self.cursor.close()
+
+    def __getattr__(self, attr: str) -> Any:
+        # Any other use of the cursor needs the search path right away
+        self._flush()
+        return getattr(self.cursor, attr)
+
+    def __iter__(self) -> Any:
+        return iter(self.cursor)
+
+
+class TransactionScopedSearchPathCursor:
+    """
+    Wraps a cursor in autocommit mode so that each statement runs in its own
+    transaction, with the search path set with `SET LOCAL` for it alone.
+    """
+
+    def __init__(self, cursor: Any, db: "DatabaseWrapper", search_path: str) -> None:
+        self.cursor = cursor
+        self.db = db
+        self.search_path = search_path
+
+    def _in_session(self, method: str, query: Any, *args: Any, **kwargs: Any) -> Any:
+        # Some statements (e.g. CREATE INDEX CONCURRENTLY) cannot run inside a
+        # transaction block, so the search path is set for the session instead
+        with self.db.connection.cursor() as cursor:
+            cursor.execute(f"SET search_path = {self.search_path}")
+            try:
+                return getattr(self.cursor, method)(query, *args, **kwargs)
+            finally:
+                with suppress(Exception):
+                    cursor.execute("RESET search_path")
+
+    def _in_transaction(self, method: str, query: Any, *args: Any, **kwargs: Any) -> Any:
+        if isinstance(query, str) and TRANSACTION_CONTROL_STATEMENT_RE.match(query):
+            return getattr(self.cursor, method)(query, *args, **kwargs)
+
+        if isinstance(query, str) and NON_TRANSACTIONAL_STATEMENT_RE.match(query):
+            return self._in_session(method, query, *args, **kwargs)
+
+        pipelined = (
+            isinstance(query, str)
+            and PIPELINE_STATEMENT_RE.match(query)
+            and can_pipeline_search_path()
+        )
+
+        with self.db.connection.cursor() as cursor:
+            try:
+                with self.db.connection.pipeline() if pipelined else nullcontext():
+                    cursor.execute("BEGIN")
+                    cursor.execute(f"SET LOCAL search_path = {self.search_path}")
+                    result = getattr(self.cursor, method)(query, *args, **kwargs)
+                    cursor.execute("COMMIT")
+            except Exception:
+                # A failed rollback must not hide the original error
+                with suppress(Exception):
+                    cursor.execute("ROLLBACK")
+                raise
+
+        return result
+
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        return self._in_transaction("execute", *args, **kwargs)
+
+    def executemany(self, *args: Any, **kwargs: Any) -> Any:
+        return self._in_transaction("executemany", *args, **kwargs)
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.cursor, attr)
+
+    def __iter__(self) -> Any:
+        return iter(self.cursor)
+
+
 class DatabaseWrapper(module.DatabaseWrapper):  # type: ignore[name-defined]
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         self._search_path: str | None = None
+        self._committed_search_path: str | None = None
+        self._savepoint_search_paths: dict[str, str | None] = {}
         self._setting_search_path = False
+        self._qualified_sql = False
         super().__init__(*args, **kwargs)
 
+        # Compilers that can qualify table names with their schema
+        self.ops.compiler_module = "django_pgschemas.postgresql.compiler"
+
         # Patched version of DatabaseIntrospection that only returns the table list for the currently selected schema
         self.introspection = DatabaseSchemaIntrospection(self)
 
+    @property
+    def pool(self) -> Any:
+        if not get_pool_schema_affinity():
+            return super().pool
+
+        if (pool := self._connection_pools.get(self.alias)) is not None:
+            return pool
+
+        pool_options = self.settings_dict["OPTIONS"].get("pool")
+
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+
+        # Same as the pool of the original backend, only with schema affinity
+        if self.settings_dict.get("CONN_MAX_AGE", 0) != 0:
+            raise ImproperlyConfigured("Pooling doesn't support persistent connections.")
+
+        try:
+            from .pool import SchemaAffinePool
+        except ImportError as err:
+            raise ImproperlyConfigured(
+                "Error loading psycopg_pool module.\nDid you install psycopg[pool]?"
+            ) from err
+
+        pool_options = {} if pool_options is True else {**pool_options}
+        pool_options.setdefault(
+            "check",
+            SchemaAffinePool.check_connection if self.settings_dict["CONN_HEALTH_CHECKS"] else None,
+        )
+        connect_kwargs = self.get_connection_params()
+        connect_kwargs["autocommit"] = True
+        pool = SchemaAffinePool(
+            kwargs=connect_kwargs,
+            open=False,
+            configure=self._configure_connection,
+            **pool_options,
+        )
+        return self._connection_pools.setdefault(self.alias, pool)
+
+    def _get_affine_pool(self, connection: Any) -> Any:
+        if connection is None or not get_pool_schema_affinity():
+            return None
+
+        from .pool import SchemaAffinePool
+
+        pool = getattr(connection, "_pool", None)
+        return pool if isinstance(pool, SchemaAffinePool) else None
+
+    @async_unsafe
+    def get_new_connection(self, conn_params: dict[str, Any]) -> Any:
+        connection = super().get_new_connection(conn_params)
+
+        # Pooled connections may already hold the search path of the active schema
+        if (pool := self._get_affine_pool(connection)) is not None:
+            self._search_path = pool.get_search_path(connection)
+
+        return connection
+
+    def _close(self) -> None:
+        if (pool := self._get_affine_pool(self.connection)) is not None:
+            pool.remember_search_path(self.connection, self._search_path)
+        super()._close()
+
     @async_unsafe
     def close(self) -> None:
-        self._search_path = None
-        self._setting_search_path = False
-        super().close()
+        try:
+            super().close()
+        finally:
+            self._search_path = None
+            self._committed_search_path = None
+            self._savepoint_search_paths.clear()
+            self._setting_search_path = False
+
+    @async_unsafe
+    def commit(self) -> None:
+        if get_transaction_pooling():
+            self._search_path = None
+        super().commit()
+        self._committed_search_path = self._search_path
+        self._savepoint_search_paths.clear()
 
     @async_unsafe
     def rollback(self) -> None:
-        self._search_path = None
+        # Only a search path set within the transaction is undone, there is
+        # nothing to undo in autocommit
+        if not self.get_autocommit():
+            self._search_path = self._committed_search_path
+        self._savepoint_search_paths.clear()
         self._setting_search_path = False
         super().rollback()
 
+    def _set_autocommit(self, autocommit: bool) -> None:
+        if not autocommit:
+            self._committed_search_path = self._search_path
+        super()._set_autocommit(autocommit)
+
+    def _savepoint(self, sid: str) -> None:
+        super()._savepoint(sid)
+        self._savepoint_search_paths[sid] = self._search_path
+
+    def _savepoint_rollback(self, sid: str) -> None:
+        super()._savepoint_rollback(sid)
+        if sid in self._savepoint_search_paths:
+            self._search_path = self._savepoint_search_paths[sid]
+
+    def _savepoint_commit(self, sid: str) -> None:
+        super()._savepoint_commit(sid)
+        self._savepoint_search_paths.pop(sid, None)
+
+    @contextmanager
+    def qualified_sql(self) -> Iterator[None]:
+        """
+        Skips setting the search path for cursors created within if it is
+        already in place, even without `PGSCHEMAS_LIMIT_SET_CALLS`, unless the
+        SQL compiled within is marked as still depending on it.
+        """
+        previous, self._qualified_sql = self._qualified_sql, True
+        try:
+            yield
+        finally:
+            self._qualified_sql = previous
+
     def _handle_search_path(self, cursor: Any | None = None) -> None:
         search_path_for_current_schema = get_search_path(get_current_schema())
 
+        # Functions, types and sequences still resolve through the search path
+        if self._qualified_sql and self._search_path == search_path_for_current_schema:
+            return
+
         skip = self._setting_search_path or (
             self._search_path == search_path_for_current_schema and get_limit_set_calls()
         )
 
-        if not skip:
+        if get_transaction_pooling() and self.get_autocommit():
+            # A search path set outside a transaction would leak to other clients
+            if cursor is not None:
+                cursor.cursor = TransactionScopedSearchPathCursor(
+                    cursor.cursor, self, search_path_for_current_schema
+                )
+        elif not skip and cursor is not None and can_pipeline_search_path():
+            cursor.cursor = PipelinedSearchPathCursor(
+                cursor.cursor, self, search_path_for_current_schema
+            )
+        elif not skip:
             self._setting_search_path = True
             cursor_for_search_path = self.connection.cursor() if cursor is None else cursor
 
             try:
                 cursor_for_search_path.execute(
-                    f"SET search_path = {search_path_for_current_schema}"
+                    get_set_search_path_sql(search_path_for_current_schema)
                 )
             except (DatabaseError, _psycopg.InternalError):
                 self._search_path = None
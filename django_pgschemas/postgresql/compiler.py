@@ -0,0 +1,155 @@
+from functools import lru_cache
+from importlib import import_module
+from typing import Any, Mapping
+
+from django.apps import apps
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db.models.expressions import RawSQL
+from django.db.models.sql.where import ExtraWhere
+from django.dispatch import receiver
+
+from django_pgschemas.routers import TenantAppsRouter
+from django_pgschemas.schema import get_current_schema
+from django_pgschemas.settings import get_qualified_table_names
+
+from .base import module
+
+_compiler = import_module(module.DatabaseWrapper.ops_class.compiler_module)
+
+
+@lru_cache
+def get_table_locations(tenant: str) -> Mapping[str, bool]:
+    """
+    Maps the tables of managed models of the `TENANTS` entry `tenant` to
+    whether they live in the tenant schema (`True`) or in public (`False`).
+    Tables named like a column of any model are left out, as they cannot be
+    told apart when quoting names.
+    """
+    router = TenantAppsRouter()
+    tenant_apps = settings.TENANTS.get(tenant, {}).get("APPS", [])
+    public_apps = settings.TENANTS.get("public", {}).get("APPS", [])
+    columns = {
+        field.column
+        for model in apps.get_models(include_auto_created=True)
+        for field in model._meta.local_concrete_fields
+    }
+    locations: dict[str, bool] = {}
+
+    for model in apps.get_models(include_auto_created=True):
+        table = model._meta.db_table
+
+        if not model._meta.managed or model._meta.proxy or table in columns:
+            continue
+
+        if router.app_in_list(model._meta.app_label, tenant_apps):
+            locations[table] = True
+        elif router.app_in_list(model._meta.app_label, public_apps):
+            locations[table] = False
+
+    return locations
+
+
+@receiver(setting_changed)
+def table_locations_callback(setting: str, **kwargs: object) -> None:
+    if setting == "TENANTS":
+        get_table_locations.cache_clear()
+
+
+class SchemaQualifiedCompilerMixin:
+    """
+    Qualifies the tables of the current tenant and of public with their
+    schema, so that the resulting SQL does not depend on the search path.
+    """
+
+    connection: Any
+    query: Any
+    quote_cache: dict[str, str]
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.qualified_schema_name: str | None = None
+        self.table_locations: Mapping[str, bool] = {}
+
+        if get_qualified_table_names():
+            schema_name = get_current_schema().schema_name
+            tenant = schema_name if schema_name in settings.TENANTS else "default"
+            self.qualified_schema_name = schema_name
+            self.table_locations = get_table_locations(tenant)
+
+    def requires_search_path(self) -> None:
+        "Signals that the SQL being compiled still needs the search path."
+        self.connection._qualified_sql = False
+
+    def qualify_table_name(self, name: str, quoted: str) -> str:
+        in_tenant = self.table_locations.get(name)
+
+        if in_tenant is None:
+            self.requires_search_path()
+            return quoted
+
+        schema_name = self.qualified_schema_name if in_tenant else "public"
+        return f"{self.connection.ops.quote_name(schema_name)}.{quoted}"
+
+    def quote_name_unless_alias(self, name: str) -> str:
+        if self.qualified_schema_name is None or name in self.quote_cache:
+            return super().quote_name_unless_alias(name)  # type: ignore[misc]
+
+        quoted = super().quote_name_unless_alias(name)  # type: ignore[misc]
+
+        if quoted != name and (name in self.query.table_map or name in self.query.external_aliases):
+            quoted = self.quote_cache[name] = self.qualify_table_name(name, quoted)
+
+        return quoted
+
+    def compile(self, node: Any) -> Any:
+        if self.qualified_schema_name is not None and isinstance(node, (RawSQL, ExtraWhere)):
+            self.requires_search_path()
+        return super().compile(node)  # type: ignore[misc]
+
+    def as_sql(self, *args: Any, **kwargs: Any) -> Any:
+        if self.qualified_schema_name is not None and (
+            self.query.extra_select or self.query.extra_tables
+        ):
+            self.requires_search_path()
+        return super().as_sql(*args, **kwargs)  # type: ignore[misc]
+
+    def execute_sql(self, *args: Any, **kwargs: Any) -> Any:
+        if self.qualified_schema_name is None:
+            return super().execute_sql(*args, **kwargs)  # type: ignore[misc]
+
+        with self.connection.qualified_sql():
+            return super().execute_sql(*args, **kwargs)  # type: ignore[misc]
+
+
+class SQLCompiler(SchemaQualifiedCompilerMixin, _compiler.SQLCompiler):  # type: ignore[name-defined]
+    pass
+
+
+class SQLInsertCompiler(SchemaQualifiedCompilerMixin, _compiler.SQLInsertCompiler):  # type: ignore[name-defined]
+    def as_sql(self, *args: Any, **kwargs: Any) -> Any:
+        statements = super().as_sql(*args, **kwargs)
+
+        if self.qualified_schema_name is None:
+            return statements
+
+        # The table of inserts is quoted without `quote_name_unless_alias`
+        table = self.query.get_meta().db_table
+        quoted = self.connection.ops.quote_name(table)
+        qualified = self.qualify_table_name(table, quoted)
+
+        return [
+            (sql.replace(f" {quoted}", f" {qualified}", 1), params) for sql, params in statements
+        ]
+
+
+class SQLDeleteCompiler(SchemaQualifiedCompilerMixin, _compiler.SQLDeleteCompiler):  # type: ignore[name-defined]
+    pass
+
+
+class SQLUpdateCompiler(SchemaQualifiedCompilerMixin, _compiler.SQLUpdateCompiler):  # type: ignore[name-defined]
+    pass
+
+
+class SQLAggregateCompiler(SchemaQualifiedCompilerMixin, _compiler.SQLAggregateCompiler):  # type: ignore[name-defined]
+    pass
@@ -0,0 +1,97 @@
+from collections import Counter
+from typing import Any
+from weakref import WeakKeyDictionary
+
+import psycopg_pool
+from django.core.exceptions import ImproperlyConfigured
+from psycopg import Connection
+from psycopg.pq import TransactionStatus
+from psycopg_pool import ConnectionPool
+
+from django_pgschemas.schema import get_current_schema
+
+# Range of psycopg-pool versions whose internals the affine pool is tested against
+SUPPORTED_PSYCOPG_POOL_VERSIONS = ((3, 2), (3, 4))
+
+
+def check_psycopg_pool_compatibility() -> None:
+    """
+    Raises `ImproperlyConfigured` if the installed psycopg-pool is not in
+    `SUPPORTED_PSYCOPG_POOL_VERSIONS`, or lacks the method that picks idle
+    connections.
+    """
+    version = tuple(int(part) for part in psycopg_pool.__version__.split(".")[:2])
+    minimum, maximum = SUPPORTED_PSYCOPG_POOL_VERSIONS
+
+    if not (minimum <= version < maximum) or not hasattr(ConnectionPool, "_get_ready_connection"):
+        raise ImproperlyConfigured(
+            "PGSCHEMAS_POOL_SCHEMA_AFFINITY requires psycopg-pool>=%s,<%s, found %s."
+            % (
+                ".".join(map(str, minimum)),
+                ".".join(map(str, maximum)),
+                psycopg_pool.__version__,
+            )
+        )
+
+
+class SchemaAffinePool(ConnectionPool):
+    """
+    Connection pool that prefers handing out idle connections whose search
+    path already matches the active schema, and falls back to the least
+    recently used idle connection otherwise.
+    """
+
+    _AFFINITY_HITS = "affinity_hits"
+    _AFFINITY_MISSES = "affinity_misses"
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        check_psycopg_pool_compatibility()
+        self._init_affinity(reset=kwargs.get("reset") is not None)
+        super().__init__(*args, **kwargs)
+
+    def _init_affinity(self, reset: bool) -> None:
+        self._search_paths: WeakKeyDictionary[Connection[Any], str] = WeakKeyDictionary()
+        self._affinity_stats: Counter[str] = Counter()
+        # A reset function may change the search path of returned connections
+        self._remembers_search_paths = not reset
+
+    def get_search_path(self, conn: Connection[Any]) -> str | None:
+        "Returns the search path `conn` was returned to the pool with, if known."
+        return self._search_paths.get(conn)
+
+    def remember_search_path(self, conn: Connection[Any], search_path: str | None) -> None:
+        "Records the search path `conn` holds, right before it is returned to the pool."
+        # The pool rolls back connections returned within a transaction
+        if (
+            search_path is None
+            or not self._remembers_search_paths
+            or conn.info.transaction_status != TransactionStatus.IDLE
+        ):
+            self._search_paths.pop(conn, None)
+        else:
+            self._search_paths[conn] = search_path
+
+    def _get_ready_connection(self, timeout: float | None) -> Connection[Any] | None:
+        if self._pool and (timeout is None or timeout > 0.0):
+            from .base import get_search_path
+
+            search_path = get_search_path(get_current_schema())
+
+            for index, conn in enumerate(self._pool):
+                if self._search_paths.get(conn) == search_path:
+                    # Move it to the front, where the next connection is taken from
+                    del self._pool[index]
+                    self._pool.appendleft(conn)
+                    self._affinity_stats[self._AFFINITY_HITS] += 1
+                    break
+            else:
+                self._affinity_stats[self._AFFINITY_MISSES] += 1
+
+        return super()._get_ready_connection(timeout)
+
+    def get_stats(self) -> dict[str, int]:
+        return {**super().get_stats(), **self._affinity_stats}
+
+    def pop_stats(self) -> dict[str, int]:
+        stats, self._affinity_stats = self._affinity_stats, Counter()
+        return {**super().pop_stats(), **stats}
@@ -0,0 +1,300 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Hashable, Iterable, NamedTuple, cast
+
+from django.core.cache import BaseCache, caches
+
+from django_pgschemas.schema import get_default_schema, override
+from django_pgschemas.settings import (
+    get_routing_cache_alias,
+    get_routing_cache_size,
+    get_routing_cache_ttl,
+    get_routing_negative_cache_size,
+    get_routing_negative_cache_ttl,
+)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class ExpiringLRUCache:
+    """
+    Thread safe, size bounded LRU cache whose entries expire after a TTL.
+
+    Size and TTL are read through callables on every access, so that they
+    follow the settings. A size of zero disables the cache.
+    """
+
+    def __init__(self, maxsize: Callable[[], int], ttl: Callable[[], float]) -> None:
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._maxsize() > 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if not self.enabled:
+            return default
+
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def get_any(self, keys: Iterable[Hashable], default: Any = None) -> Any:
+        """
+        Returns the value of the first of `keys` found, counting a single hit
+        or miss for all of them.
+        """
+        if not self.enabled:
+            return default
+
+        now = time.monotonic()
+
+        with self._lock:
+            for key in keys:
+                item = self._data.get(key)
+                if item is None:
+                    continue
+                if item[0] < now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        maxsize = self._maxsize()
+        if maxsize <= 0:
+            return
+
+        expires = time.monotonic() + self._ttl()
+
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self._maxsize(), len(self._data))
+
+
+class SharedCache:
+    """
+    Cache shared between processes through a Django cache alias.
+
+    Entries are stored along the version that was current when they were
+    looked up. Bumping the version makes all previous entries stale at once,
+    in every process. The alias is read through a callable on every access,
+    so that it follows the settings. No alias disables the cache.
+    """
+
+    version_key = "pgschemas:routing:version"
+
+    def __init__(self, alias: Callable[[], str | None]) -> None:
+        self._alias = alias
+
+    @property
+    def enabled(self) -> bool:
+        return self._alias() is not None
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[cast(str, self._alias())]
+
+    def make_key(self, *parts: str) -> str:
+        digest = hashlib.md5("\x00".join(parts).encode(), usedforsecurity=False).hexdigest()
+        return f"pgschemas:routing:{digest}"
+
+    def _unpack(self, key: str, values: dict[str, Any]) -> tuple[str | None, Any]:
+        version = values.get(self.version_key)
+        item = values.get(key)
+        if version is not None and item is not None and item[0] == version:
+            return version, item[1]
+        return version, None
+
+    def get(self, key: str) -> tuple[str | None, Any]:
+        """
+        Returns the current version along the value stored under `key`, or
+        `None` if missing or stale. The version must be passed to `set`.
+        """
+        if not self.enabled:
+            return None, None
+        # Keys must not depend on the active schema, see contrib.cache.make_key
+        with override(get_default_schema()):
+            version, value = self._unpack(key, self.cache.get_many([self.version_key, key]))
+            if version is None:
+                self.cache.add(self.version_key, uuid.uuid4().hex, None)
+                version = self.cache.get(self.version_key)
+        return version, value
+
+    async def aget(self, key: str) -> tuple[str | None, Any]:
+        "Async version of `get`."
+        if not self.enabled:
+            return None, None
+        with override(get_default_schema()):
+            values = await self.cache.aget_many([self.version_key, key])
+            version, value = self._unpack(key, values)
+            if version is None:
+                await self.cache.aadd(self.version_key, uuid.uuid4().hex, None)
+                version = await self.cache.aget(self.version_key)
+        return version, value
+
+    def set(self, key: str, version: str | None, value: Any) -> None:
+        if version is None:
+            return
+        with override(get_default_schema()):
+            self.cache.set(key, (version, value))
+
+    async def aset(self, key: str, version: str | None, value: Any) -> None:
+        "Async version of `set`."
+        if version is None:
+            return
+        with override(get_default_schema()):
+            await self.cache.aset(key, (version, value))
+
+    def bump_version(self) -> None:
+        if not self.enabled:
+            return
+        with override(get_default_schema()):
+            self.cache.set(self.version_key, uuid.uuid4().hex, None)
+
+
+class RejectionCounter:
+    """
+    Thread safe counter of rejected hostnames.
+
+    At most `maxsize` distinct hostnames are tracked, so that random hostnames
+    cannot grow it unbounded. Further hostnames only add to the total.
+    """
+
+    def __init__(self, maxsize: int = 1000) -> None:
+        self.maxsize = maxsize
+        self.total = 0
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, hostname: str) -> None:
+        with self._lock:
+            self.total += 1
+            if hostname in self._counts or len(self._counts) < self.maxsize:
+                self._counts[hostname] += 1
+
+    def most_common(self, n: int | None = None) -> list[tuple[str, int]]:
+        with self._lock:
+            return self._counts.most_common(n)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.total = 0
+            self._counts.clear()
+
+
+class DeferredTenantCounter:
+    """
+    Thread safe counters of tenants handed out by routing with deferred fields,
+    and of those that had their deferred fields loaded afterwards.
+    """
+
+    def __init__(self) -> None:
+        self.deferred = 0
+        self.loaded = 0
+        self._lock = threading.Lock()
+
+    @property
+    def never_loaded(self) -> int:
+        return self.deferred - self.loaded
+
+    def add_deferred(self) -> None:
+        with self._lock:
+            self.deferred += 1
+
+    def add_loaded(self) -> None:
+        with self._lock:
+            self.loaded += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.deferred = 0
+            self.loaded = 0
+
+
+domain_cache = ExpiringLRUCache(get_routing_cache_size, get_routing_cache_ttl)
+"""
+Resolved domain routes, keyed by `(hostname, folder prefix)`.
+"""
+
+reference_cache = ExpiringLRUCache(get_routing_cache_size, get_routing_cache_ttl)
+"""
+Tenants found by session or header reference, keyed by reference.
+"""
+
+primary_domain_cache = ExpiringLRUCache(get_routing_cache_size, get_routing_cache_ttl)
+"""
+Primary domains of tenants, or `None` if they have none, keyed by tenant pk.
+"""
+
+negative_domain_cache = ExpiringLRUCache(
+    get_routing_negative_cache_size, get_routing_negative_cache_ttl
+)
+"""
+Domain lookups that found no tenant, keyed by `hostname` when the hostname is
+unknown altogether, or by `(hostname, folder prefix)` otherwise.
+"""
+
+shared_cache = SharedCache(get_routing_cache_alias)
+"""
+Resolved domain routes and tenants found by reference, shared between
+processes.
+"""
+
+rejected_hostnames = RejectionCounter()
+"""
+Hostnames for which domain routing found no dynamic tenant.
+"""
+
+deferred_tenants = DeferredTenantCounter()
+"""
+Tenants handed out by routing with the fields left out by
+`PGSCHEMAS_ROUTING_TENANT_FIELDS` deferred.
+"""
+
+
+def clear_routing_caches() -> None:
+    "Clears all in-process routing caches and invalidates the shared one."
+    domain_cache.clear()
+    reference_cache.clear()
+    primary_domain_cache.clear()
+    negative_domain_cache.clear()
+    shared_cache.bump_version()
@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping, Self
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from django_pgschemas.routing.info import DomainInfo, HeadersInfo, RoutingInfo, SessionInfo
+from django_pgschemas.schema import intern_static_schemas
+
+
+def is_wildcard_domain(domain: str) -> bool:
+    "Returns whether `domain` is a wildcard domain like `*.example.com`."
+    return domain.startswith("*.") and len(domain) > 2 and "*" not in domain[2:]
+
+
+def split_hostname(hostname: str) -> tuple[str, str]:
+    """
+    Splits `hostname` into its leftmost label and the rest, which is what a
+    wildcard domain is matched against.
+    """
+    label, _, suffix = hostname.partition(".")
+    return label, suffix
+
+
+@dataclass(frozen=True)
+class StaticRoutingIndex:
+    """
+    Immutable lookup tables for routing static tenants.
+
+    All references map to the schema name of the first static tenant (in
+    settings order) that declares them. Wildcard domains are kept apart,
+    keyed by the suffix they match, as they cover exactly one label.
+    """
+
+    domains: Mapping[str, str]
+    fallback_domains: Mapping[str, str]
+    any_domains: Mapping[str, str]
+    wildcard_domains: Mapping[str, str]
+    wildcard_fallback_domains: Mapping[str, str]
+    wildcard_any_domains: Mapping[str, str]
+    dynamic_wildcard_domains: frozenset[str]
+    headers: Mapping[str, str]
+    session_keys: Mapping[str, str]
+    urlconfs: Mapping[str, str | None]
+    ws_urlconfs: Mapping[str, str | None]
+
+    @staticmethod
+    def _match(exact: Mapping[str, str], wildcard: Mapping[str, str], hostname: str) -> str | None:
+        if (schema := exact.get(hostname)) is not None:
+            return schema
+        label, suffix = split_hostname(hostname)
+        return wildcard.get(suffix) if label else None
+
+    def get_domain(self, hostname: str) -> str | None:
+        return self._match(self.domains, self.wildcard_domains, hostname)
+
+    def get_fallback_domain(self, hostname: str) -> str | None:
+        return self._match(self.fallback_domains, self.wildcard_fallback_domains, hostname)
+
+    def get_any_domain(self, hostname: str) -> str | None:
+        return self._match(self.any_domains, self.wildcard_any_domains, hostname)
+
+    def get_static_schema_keys(self) -> Iterator[tuple[str, RoutingInfo]]:
+        """
+        Yields the schema name and routing of every schema descriptor that
+        routing static tenants can produce, wildcard domains aside.
+        """
+        for schema in self.urlconfs:
+            yield schema, None
+        for domain, schema in self.any_domains.items():
+            yield schema, DomainInfo(domain=domain)
+        for header, schema in self.headers.items():
+            yield schema, HeadersInfo(reference=header)
+        for session_key, schema in self.session_keys.items():
+            yield schema, SessionInfo(reference=session_key)
+
+    def get_dynamic_wildcard_schema_name(self, hostname: str) -> str | None:
+        """
+        Returns the leftmost label of `hostname` if the rest matches one of
+        the wildcard domains of dynamic tenants.
+        """
+        label, suffix = split_hostname(hostname)
+        return label if label and suffix in self.dynamic_wildcard_domains else None
+
+    @classmethod
+    def build(cls, tenants: dict[str, Any]) -> Self:
+        domains: dict[str, str] = {}
+        fallback_domains: dict[str, str] = {}
+        any_domains: dict[str, str] = {}
+        wildcard_domains: dict[str, str] = {}
+        wildcard_fallback_domains: dict[str, str] = {}
+        wildcard_any_domains: dict[str, str] = {}
+        headers: dict[str, str] = {}
+        session_keys: dict[str, str] = {}
+        urlconfs: dict[str, str | None] = {}
+        ws_urlconfs: dict[str, str | None] = {}
+
+        for schema, data in tenants.items():
+            if schema in ["public", "default"]:
+                continue
+
+            for domain in data.get("DOMAINS", []):
+                if is_wildcard_domain(domain):
+                    wildcard_domains.setdefault(domain[2:], schema)
+                    wildcard_any_domains.setdefault(domain[2:], schema)
+                else:
+                    domains.setdefault(domain, schema)
+                    any_domains.setdefault(domain, schema)
+            for domain in data.get("FALLBACK_DOMAINS", []):
+                if is_wildcard_domain(domain):
+                    wildcard_fallback_domains.setdefault(domain[2:], schema)
+                    wildcard_any_domains.setdefault(domain[2:], schema)
+                else:
+                    fallback_domains.setdefault(domain, schema)
+                    any_domains.setdefault(domain, schema)
+
+            headers.setdefault(schema, schema)
+            session_keys.setdefault(schema, schema)
+            if (header := data.get("HEADER")) is not None:
+                headers.setdefault(header, schema)
+            if (session_key := data.get("SESSION_KEY")) is not None:
+                session_keys.setdefault(session_key, schema)
+
+            urlconfs[schema] = data.get("URLCONF")
+            ws_urlconfs[schema] = data.get("WS_URLCONF")
+
+        dynamic_wildcard_domains = frozenset(
+            domain[2:]
+            for domain in tenants.get("default", {}).get("DOMAINS", [])
+            if is_wildcard_domain(domain)
+        )
+
+        return cls(
+            domains=MappingProxyType(domains),
+            fallback_domains=MappingProxyType(fallback_domains),
+            any_domains=MappingProxyType(any_domains),
+            wildcard_domains=MappingProxyType(wildcard_domains),
+            wildcard_fallback_domains=MappingProxyType(wildcard_fallback_domains),
+            wildcard_any_domains=MappingProxyType(wildcard_any_domains),
+            dynamic_wildcard_domains=dynamic_wildcard_domains,
+            headers=MappingProxyType(headers),
+            session_keys=MappingProxyType(session_keys),
+            urlconfs=MappingProxyType(urlconfs),
+            ws_urlconfs=MappingProxyType(ws_urlconfs),
+        )
+
+
+_static_routing_index: StaticRoutingIndex | None = None
+
+
+def build_static_routing_index() -> StaticRoutingIndex:
+    "Builds the static routing index from the current `TENANTS` setting."
+    global _static_routing_index
+    tenants = getattr(settings, "TENANTS", None) or {}
+    _static_routing_index = StaticRoutingIndex.build(tenants)
+
+    # Schema descriptors of static tenants and the clone reference are created once
+    clone_reference = tenants.get("default", {}).get("CLONE_REFERENCE")
+    intern_static_schemas(
+        [
+            ("public", None),
+            *_static_routing_index.get_static_schema_keys(),
+            *([(clone_reference, None)] if clone_reference else []),
+        ]
+    )
+
+    return _static_routing_index
+
+
+def get_static_routing_index() -> StaticRoutingIndex:
+    if _static_routing_index is None:
+        return build_static_routing_index()
+    return _static_routing_index
+
+
+@receiver(setting_changed)
+def static_routing_index_callback(setting: str, **kwargs: object) -> None:
+    if setting == "TENANTS":
+        build_static_routing_index()
@@ -1,22 +1,26 @@
 import re
-from typing import Callable, TypeAlias, cast
+from typing import Awaitable, Callable, TypeAlias
 
 from asgiref.sync import iscoroutinefunction, sync_to_async
-from django.conf import settings
 from django.core.signals import request_finished
-from django.db.models import Q
 from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import redirect
-from django.urls import clear_url_caches, set_urlconf
+from django.urls import set_urlconf
 from django.utils.decorators import sync_and_async_middleware
 
-from django_pgschemas.models import TenantModel as TenantModelBase
+from django_pgschemas.routing.index import get_static_routing_index
 from django_pgschemas.routing.info import DomainInfo, HeadersInfo, SessionInfo
-from django_pgschemas.routing.models import get_primary_domain_for_tenant
+from django_pgschemas.routing.models import (
+    DomainRoute,
+    afind_tenant_by_reference,
+    aresolve_domain,
+    find_tenant_by_reference,
+    resolve_domain,
+)
 from django_pgschemas.routing.urlresolvers import get_urlconf_from_schema
 from django_pgschemas.schema import Schema, activate, activate_public
 from django_pgschemas.settings import get_tenant_header, get_tenant_session_key
-from django_pgschemas.utils import get_domain_model, get_tenant_model, remove_www
+from django_pgschemas.utils import remove_www
 
 
 def strip_tenant_from_path_factory(prefix: str) -> Callable[[str], str]:
@@ -40,70 +44,47 @@ def apply_tenant_to_request(request: HttpRequest, tenant: Schema) -> None:
     activate(tenant)
 
 
-def route_domain(request: HttpRequest) -> HttpResponse | None:
+def get_hostname_and_prefix(request: HttpRequest) -> tuple[str, str]:
     hostname = remove_www(request.get_host().split(":")[0])
-
-    activate_public()
+    prefix = request.path.split("/")[1]
+    return hostname, prefix
+
+
+def route_domain_with(
+    request: HttpRequest, hostname: str, prefix: str, route: DomainRoute | None
+) -> HttpResponse | None:
+    """
+    Applies the tenant for `hostname` to the request, taking the dynamic
+    `route` into account if static tenants don't match.
+    """
+    static_index = get_static_routing_index()
     tenant: Schema | None = None
 
     # Checking for static tenants
-    for schema, data in settings.TENANTS.items():
-        if schema in ["public", "default"]:
-            continue
-        if hostname in data.get("DOMAINS", []):
-            tenant = Schema.create(
-                schema_name=schema,
-                routing=DomainInfo(domain=hostname),
-            )
-            break
+    if (schema := static_index.get_domain(hostname)) is not None:
+        tenant = Schema.create(
+            schema_name=schema,
+            routing=DomainInfo(domain=hostname),
+        )
 
     # Checking for dynamic tenants
-    else:
-        DomainModel = get_domain_model()
-
-        prefix = request.path.split("/")[1]
-        domain = None
-
-        if DomainModel is not None:
-            try:
-                domain = DomainModel.objects.select_related("tenant").get(
-                    domain=hostname, folder=prefix
-                )
-            except DomainModel.DoesNotExist:
-                try:
-                    domain = DomainModel.objects.select_related("tenant").get(
-                        domain=hostname, folder=""
-                    )
-                except DomainModel.DoesNotExist:
-                    pass
-
-        if domain is not None:
-            tenant = cast(TenantModelBase, domain.tenant)
-            tenant.routing = DomainInfo(domain=hostname)
-            request.strip_tenant_from_path = lambda x: x
-
-            if prefix and domain.folder == prefix:
-                tenant.routing = DomainInfo(domain=hostname, folder=prefix)
-                request.strip_tenant_from_path = strip_tenant_from_path_factory(prefix)
-                clear_url_caches()  # Required to remove previous tenant prefix from cache (#8)
-
-            if domain.redirect_to_primary:
-                primary_domain = get_primary_domain_for_tenant(tenant)
-                if primary_domain:
-                    path = request.strip_tenant_from_path(request.path)
-                    return redirect(primary_domain.absolute_url(path), permanent=True)
+    elif route is not None:
+        tenant = route.get_tenant()
+        request.strip_tenant_from_path = lambda x: x
+
+        if route.routing.folder:
+            request.strip_tenant_from_path = strip_tenant_from_path_factory(prefix)
+
+        if route.redirect_to_primary and route.primary_domain:
+            path = request.strip_tenant_from_path(request.path)
+            return redirect(route.primary_domain.absolute_url(path), permanent=True)
 
     # Checking fallback domains
-    if not tenant:
-        for schema, data in settings.TENANTS.items():
-            if schema in ["public", "default"]:
-                continue
-            if hostname in data.get("FALLBACK_DOMAINS", []):
-                tenant = Schema.create(
-                    schema_name=schema,
-                    routing=DomainInfo(domain=hostname),
-                )
-                break
+    if not tenant and (schema := static_index.get_fallback_domain(hostname)) is not None:
+        tenant = Schema.create(
+            schema_name=schema,
+            routing=DomainInfo(domain=hostname),
+        )
 
     # No tenant found from domain / folder
     if not tenant:
@@ -113,6 +94,30 @@ def route_domain(request: HttpRequest) -> HttpResponse | None:
     return None
 
 
+def route_domain(request: HttpRequest) -> HttpResponse | None:
+    activate_public()
+
+    hostname, prefix = get_hostname_and_prefix(request)
+    route = None
+
+    if get_static_routing_index().get_domain(hostname) is None:
+        route = resolve_domain(hostname, prefix)
+
+    return route_domain_with(request, hostname, prefix, route)
+
+
+async def aroute_domain(request: HttpRequest) -> HttpResponse | None:
+    activate_public()
+
+    hostname, prefix = get_hostname_and_prefix(request)
+    route = None
+
+    if get_static_routing_index().get_domain(hostname) is None:
+        route = await aresolve_domain(hostname, prefix)
+
+    return route_domain_with(request, hostname, prefix, route)
+
+
 def route_session(request: HttpRequest) -> HttpResponse | None:
     activate_public()
 
@@ -126,22 +131,40 @@ def route_session(request: HttpRequest) -> HttpResponse | None:
     tenant: Schema | None = None
 
     # Checking for static tenants
-    for schema, data in settings.TENANTS.items():
-        if schema in ["public", "default"]:
-            continue
-        if tenant_ref == schema or tenant_ref == data.get("SESSION_KEY"):
-            tenant = Schema.create(schema_name=schema)
-            break
+    if (schema := get_static_routing_index().session_keys.get(tenant_ref)) is not None:
+        tenant = Schema.create(schema_name=schema, routing=SessionInfo(reference=tenant_ref))
 
     # Checking for dynamic tenants
-    else:
-        if (TenantModel := get_tenant_model()) is not None:
-            tenant = TenantModel._default_manager.filter(
-                Q(pk__iexact=tenant_ref) | Q(schema_name=tenant_ref)
-            ).first()
+    elif (tenant := find_tenant_by_reference(tenant_ref)) is not None:
+        tenant.routing = SessionInfo(reference=tenant_ref)
 
     if tenant is not None:
+        apply_tenant_to_request(request, tenant)
+
+    return None
+
+
+async def aroute_session(request: HttpRequest) -> HttpResponse | None:
+    activate_public()
+
+    tenant_session_key = get_tenant_session_key()
+
+    if not hasattr(request, "session") or not (
+        tenant_ref := await request.session.aget(tenant_session_key)
+    ):
+        return None
+
+    tenant: Schema | None = None
+
+    # Checking for static tenants
+    if (schema := get_static_routing_index().session_keys.get(tenant_ref)) is not None:
+        tenant = Schema.create(schema_name=schema, routing=SessionInfo(reference=tenant_ref))
+
+    # Checking for dynamic tenants
+    elif (tenant := await afind_tenant_by_reference(tenant_ref)) is not None:
         tenant.routing = SessionInfo(reference=tenant_ref)
+
+    if tenant is not None:
         apply_tenant_to_request(request, tenant)
 
     return None
@@ -158,22 +181,38 @@ def route_headers(request: HttpRequest) -> HttpResponse | None:
     tenant: Schema | None = None
 
     # Checking for static tenants
-    for schema, data in settings.TENANTS.items():
-        if schema in ["public", "default"]:
-            continue
-        if tenant_ref == schema or tenant_ref == data.get("HEADER"):
-            tenant = Schema.create(schema_name=schema)
-            break
+    if (schema := get_static_routing_index().headers.get(tenant_ref)) is not None:
+        tenant = Schema.create(schema_name=schema, routing=HeadersInfo(reference=tenant_ref))
 
     # Checking for dynamic tenants
-    else:
-        if (TenantModel := get_tenant_model()) is not None:
-            tenant = TenantModel._default_manager.filter(
-                Q(pk__iexact=tenant_ref) | Q(schema_name=tenant_ref)
-            ).first()
+    elif (tenant := find_tenant_by_reference(tenant_ref)) is not None:
+        tenant.routing = HeadersInfo(reference=tenant_ref)
 
     if tenant is not None:
+        apply_tenant_to_request(request, tenant)
+
+    return None
+
+
+async def aroute_headers(request: HttpRequest) -> HttpResponse | None:
+    activate_public()
+
+    tenant_header = get_tenant_header()
+
+    if not (tenant_ref := request.headers.get(tenant_header)):
+        return None
+
+    tenant: Schema | None = None
+
+    # Checking for static tenants
+    if (schema := get_static_routing_index().headers.get(tenant_ref)) is not None:
+        tenant = Schema.create(schema_name=schema, routing=HeadersInfo(reference=tenant_ref))
+
+    # Checking for dynamic tenants
+    elif (tenant := await afind_tenant_by_reference(tenant_ref)) is not None:
         tenant.routing = HeadersInfo(reference=tenant_ref)
+
+    if tenant is not None:
         apply_tenant_to_request(request, tenant)
 
     return None
@@ -181,36 +220,42 @@ def route_headers(request: HttpRequest) -> HttpResponse | None:
 
 def middleware_factory(
     handler: Callable[[HttpRequest], HttpResponse | None],
+    async_handler: Callable[[HttpRequest], Awaitable[HttpResponse | None]] | None = None,
 ) -> Callable[[ResponseHandler], ResponseHandler]:
+    """
+    Builds a routing middleware out of `handler`. Under ASGI, `async_handler`
+    is used if provided, otherwise `handler` is run in a thread.
+    """
+
     @sync_and_async_middleware
     def middleware(get_response: ResponseHandler) -> ResponseHandler:
         if iscoroutinefunction(get_response):
-            async_base_middleware = sync_to_async(handler)
+            async_base_middleware = async_handler or sync_to_async(handler)
 
-            async def sync_middleware(request: HttpRequest) -> HttpResponse | None:
+            async def async_middleware(request: HttpRequest) -> HttpResponse | None:
                 if response := await async_base_middleware(request):
                     return response
 
                 return await get_response(request)
 
-            return sync_middleware
+            return async_middleware
 
         else:
 
-            def async_middleware(request: HttpRequest) -> HttpResponse | None:
+            def sync_middleware(request: HttpRequest) -> HttpResponse | None:
                 if response := handler(request):
                     return response
 
                 return get_response(request)
 
-            return async_middleware
+            return sync_middleware
 
     return middleware
 
 
-DomainRoutingMiddleware = middleware_factory(route_domain)
-SessionRoutingMiddleware = middleware_factory(route_session)
-HeadersRoutingMiddleware = middleware_factory(route_headers)
+DomainRoutingMiddleware = middleware_factory(route_domain, aroute_domain)
+SessionRoutingMiddleware = middleware_factory(route_session, aroute_session)
+HeadersRoutingMiddleware = middleware_factory(route_headers, aroute_headers)
 
 
 def _reset_schema_after_request(**kwargs: object) -> None:
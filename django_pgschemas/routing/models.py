@@ -1,8 +1,34 @@
+import copy
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable, cast
+
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.db import models, transaction
+from django.db.models import Case, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from django_pgschemas.models import TenantModel
-from django_pgschemas.utils import get_domain_model
+from django_pgschemas.routing.cache import (
+    clear_routing_caches,
+    deferred_tenants,
+    domain_cache,
+    negative_domain_cache,
+    primary_domain_cache,
+    reference_cache,
+    rejected_hostnames,
+    shared_cache,
+)
+from django_pgschemas.routing.index import (
+    get_static_routing_index,
+    is_wildcard_domain,
+    split_hostname,
+)
+from django_pgschemas.routing.info import DomainInfo
+from django_pgschemas.settings import get_routing_hostname_regex, get_routing_tenant_fields
+from django_pgschemas.utils import chunked, get_domain_model, get_tenant_model
 
 
 class DomainModel(models.Model):
@@ -64,13 +90,368 @@ class DomainModel(models.Model):
         return f"//{final_path}"
 
 
+_missing = object()
+
+
 def get_primary_domain_for_tenant(tenant: TenantModel) -> DomainModel | None:
     DomainModel = get_domain_model()
 
     if DomainModel is None:
         return None
 
+    if (domain := primary_domain_cache.get(tenant.pk, _missing)) is not _missing:
+        return domain
+
     try:
-        return tenant.domains.get(is_primary=True)
+        domain = tenant.domains.get(is_primary=True)
     except DomainModel.DoesNotExist:
+        domain = None
+
+    primary_domain_cache.set(tenant.pk, domain)
+    return domain
+
+
+def get_primary_domains_for_schemas(schema_names: Iterable[str]) -> dict[str, DomainModel]:
+    """
+    Returns the primary domains of the dynamic tenants in `schema_names` with
+    a query per chunk of schema names, keyed by schema name. Tenants without
+    primary domain are left out.
+    """
+    DomainModel = get_domain_model()
+
+    if DomainModel is None:
+        return {}
+
+    primary_domains = {}
+
+    for chunk in chunked(schema_names):
+        for domain in (
+            DomainModel.objects.filter(tenant__schema_name__in=chunk, is_primary=True)
+            .annotate(_schema_name=F("tenant__schema_name"))
+            .order_by("pk")
+        ):
+            if domain._schema_name in primary_domains:
+                continue
+            primary_domains[domain._schema_name] = domain
+            primary_domain_cache.set(domain.tenant_id, domain)
+
+    return primary_domains
+
+
+@dataclass(frozen=True)
+class DomainRoute:
+    """
+    The outcome of resolving a hostname and folder prefix to a dynamic tenant.
+    """
+
+    tenant: TenantModel
+    routing: DomainInfo
+    redirect_to_primary: bool = False
+    primary_domain: DomainModel | None = None
+
+    def get_tenant(self) -> TenantModel:
+        """
+        Returns a copy of the resolved tenant with its routing info set, so
+        that the cached instance is never shared between requests.
+        """
+        tenant = hand_out_tenant(self.tenant)
+        tenant.routing = self.routing
+        return tenant
+
+
+def hand_out_tenant(tenant: TenantModel) -> TenantModel:
+    """
+    Returns a copy of a tenant found by routing, keeping track of it if it
+    has deferred fields.
+    """
+    tenant = copy.copy(tenant)
+    if tenant.get_deferred_fields():
+        tenant._deferred_by_routing = True
+        deferred_tenants.add_deferred()
+    return tenant
+
+
+def get_routing_deferred_fields(TenantModel: type[TenantModel]) -> list[str]:
+    """
+    Returns the fields of the tenant model that routing doesn't fetch, as per
+    `PGSCHEMAS_ROUTING_TENANT_FIELDS`.
+    """
+    if (fields := get_routing_tenant_fields()) is None:
+        return []
+    return [
+        field.name
+        for field in TenantModel._meta.concrete_fields
+        if not field.primary_key and field.name not in {"schema_name", *fields}
+    ]
+
+
+def _domain_patterns(hostname: str) -> list[str]:
+    "Returns `hostname` and the wildcard domain that would match it, if any."
+    label, suffix = split_hostname(hostname)
+    return [hostname, f"*.{suffix}"] if label and suffix else [hostname]
+
+
+def _domain_candidates(
+    DomainModel: type[DomainModel], hostname: str, prefix: str
+) -> models.QuerySet[DomainModel]:
+    """
+    Returns the domains matching `hostname`, exactly or as wildcard, annotated
+    with the primary domain of their tenant. Domains with the folder `prefix`
+    or with no folder come first, preferring exact matches and then the
+    folder, so that the first domain tells whether the hostname is known when
+    none of them match.
+    """
+    # Ordered, so that all fields come from the same row even if a tenant has
+    # more than one primary domain
+    primary_domains = DomainModel.objects.filter(
+        tenant=OuterRef("tenant"), is_primary=True
+    ).order_by("pk")
+    deferred_fields = get_routing_deferred_fields(cast(type[TenantModel], get_tenant_model()))
+    return (
+        DomainModel.objects.select_related("tenant")
+        .defer(*[f"tenant__{field}" for field in deferred_fields])
+        .filter(domain__in=_domain_patterns(hostname))
+        .annotate(
+            _primary_pk=Subquery(primary_domains.values("pk")[:1]),
+            _primary_domain=Subquery(primary_domains.values("domain")[:1]),
+            _primary_folder=Subquery(primary_domains.values("folder")[:1]),
+        )
+        .order_by(
+            Case(When(folder__in={prefix, ""}, then=Value(0)), default=Value(1)),
+            Case(When(domain=hostname, then=Value(0)), default=Value(1)),
+            "-folder",
+        )
+    )
+
+
+def _wildcard_tenant_candidates(
+    TenantModel: type[TenantModel], hostname: str
+) -> models.QuerySet[TenantModel] | None:
+    """
+    Returns the tenant whose schema name is the leftmost label of `hostname`,
+    if the rest matches a wildcard domain of dynamic tenants.
+    """
+    schema_name = get_static_routing_index().get_dynamic_wildcard_schema_name(hostname)
+    if schema_name is None:
+        return None
+    return TenantModel._default_manager.filter(schema_name=schema_name).defer(
+        *get_routing_deferred_fields(TenantModel)
+    )
+
+
+def _make_domain_route(domain: Any, hostname: str, prefix: str) -> DomainRoute:
+    primary_domain = None
+    if (
+        domain.redirect_to_primary
+        and domain._primary_pk is not None
+        and not is_wildcard_domain(domain._primary_domain)
+    ):
+        primary_domain = domain.__class__(
+            pk=domain._primary_pk,
+            tenant_id=domain.tenant_id,
+            domain=domain._primary_domain,
+            folder=domain._primary_folder,
+            is_primary=True,
+        )
+
+    return DomainRoute(
+        tenant=cast(TenantModel, domain.tenant),
+        routing=DomainInfo(
+            domain=hostname,
+            folder=prefix if prefix and domain.folder == prefix else None,
+        ),
+        redirect_to_primary=domain.redirect_to_primary,
+        primary_domain=primary_domain,
+    )
+
+
+def is_hostname_allowed(hostname: str) -> bool:
+    """
+    Returns whether `hostname` matches `PGSCHEMAS_ROUTING_HOSTNAME_REGEX`, if
+    set. Hostnames of static tenants are always allowed.
+    """
+    if (regex := get_routing_hostname_regex()) is None:
+        return True
+    return (
+        get_static_routing_index().get_any_domain(hostname) is not None
+        or re.fullmatch(regex, hostname) is not None
+    )
+
+
+def _reject(hostname: str) -> None:
+    if get_static_routing_index().get_any_domain(hostname) is None:
+        rejected_hostnames.add(hostname)
+
+
+def _is_known_miss(hostname: str, prefix: str) -> bool:
+    """
+    Returns whether the lookup of `hostname` and `prefix` can be skipped,
+    because the hostname is not allowed or the lookup recently found nothing.
+    """
+    if not is_hostname_allowed(hostname) or negative_domain_cache.get_any(
+        [hostname, (hostname, prefix)]
+    ):
+        _reject(hostname)
+        return True
+    return False
+
+
+def _remember_miss(hostname: str, prefix: str, hostname_exists: bool) -> None:
+    negative_domain_cache.set((hostname, prefix) if hostname_exists else hostname, True)
+    _reject(hostname)
+
+
+def resolve_domain(hostname: str, prefix: str) -> DomainRoute | None:
+    """
+    Resolves `hostname` and the folder `prefix` of a path to a dynamic tenant,
+    through the wildcard domains of dynamic tenants first, and the domain
+    model next. Results are kept in the routing caches, misses in the negative
+    routing cache.
+    """
+    if (route := domain_cache.get((hostname, prefix))) is not None:
+        return route
+
+    DomainModel = get_domain_model()
+    TenantModel = get_tenant_model()
+
+    if TenantModel is None or _is_known_miss(hostname, prefix):
+        return None
+
+    shared_key = shared_cache.make_key("domain", hostname, prefix)
+    version, route = shared_cache.get(shared_key)
+
+    if route is not None:
+        domain_cache.set((hostname, prefix), route)
+        return route
+
+    if (tenants := _wildcard_tenant_candidates(TenantModel, hostname)) is not None:
+        if (tenant := tenants.first()) is not None:
+            route = DomainRoute(tenant=tenant, routing=DomainInfo(domain=hostname))
+
+    hostname_exists = False
+
+    if route is None and DomainModel is not None:
+        if (domain := _domain_candidates(DomainModel, hostname, prefix).first()) is not None:
+            hostname_exists = True
+            if domain.folder in {prefix, ""}:
+                route = _make_domain_route(domain, hostname, prefix)
+
+    if route is None:
+        _remember_miss(hostname, prefix, hostname_exists)
+        return None
+
+    domain_cache.set((hostname, prefix), route)
+    shared_cache.set(shared_key, version, route)
+    return route
+
+
+async def aresolve_domain(hostname: str, prefix: str) -> DomainRoute | None:
+    "Async version of `resolve_domain`."
+    if (route := domain_cache.get((hostname, prefix))) is not None:
+        return route
+
+    DomainModel = get_domain_model()
+    TenantModel = get_tenant_model()
+
+    if TenantModel is None or _is_known_miss(hostname, prefix):
+        return None
+
+    shared_key = shared_cache.make_key("domain", hostname, prefix)
+    version, route = await shared_cache.aget(shared_key)
+
+    if route is not None:
+        domain_cache.set((hostname, prefix), route)
+        return route
+
+    if (tenants := _wildcard_tenant_candidates(TenantModel, hostname)) is not None:
+        if (tenant := await tenants.afirst()) is not None:
+            route = DomainRoute(tenant=tenant, routing=DomainInfo(domain=hostname))
+
+    hostname_exists = False
+
+    if route is None and DomainModel is not None:
+        if (domain := await _domain_candidates(DomainModel, hostname, prefix).afirst()) is not None:
+            hostname_exists = True
+            if domain.folder in {prefix, ""}:
+                route = _make_domain_route(domain, hostname, prefix)
+
+    if route is None:
+        _remember_miss(hostname, prefix, hostname_exists)
         return None
+
+    domain_cache.set((hostname, prefix), route)
+    await shared_cache.aset(shared_key, version, route)
+    return route
+
+
+def _tenant_reference_filter(TenantModel: type[TenantModel], reference: str) -> Q:
+    # Exact lookups only, so that the indexes on both columns can be used
+    lookup = Q(schema_name=reference)
+    try:
+        pk = TenantModel._meta.pk.to_python(reference)
+    except ValidationError:
+        return lookup
+    return lookup | Q(pk=pk)
+
+
+def find_tenant_by_reference(reference: str) -> TenantModel | None:
+    """
+    Finds a dynamic tenant by primary key or schema name, as used by session
+    and header routing. Results are kept in the routing caches.
+    """
+    if (TenantModel := get_tenant_model()) is None:
+        return None
+
+    if (tenant := reference_cache.get(reference)) is not None:
+        return hand_out_tenant(tenant)
+
+    shared_key = shared_cache.make_key("reference", reference)
+    version, tenant = shared_cache.get(shared_key)
+
+    if tenant is None:
+        tenant = (
+            TenantModel._default_manager.filter(_tenant_reference_filter(TenantModel, reference))
+            .defer(*get_routing_deferred_fields(TenantModel))
+            .first()
+        )
+        if tenant is None:
+            return None
+        shared_cache.set(shared_key, version, tenant)
+
+    reference_cache.set(reference, tenant)
+    return hand_out_tenant(tenant)
+
+
+async def afind_tenant_by_reference(reference: str) -> TenantModel | None:
+    "Async version of `find_tenant_by_reference`."
+    if (TenantModel := get_tenant_model()) is None:
+        return None
+
+    if (tenant := reference_cache.get(reference)) is not None:
+        return hand_out_tenant(tenant)
+
+    shared_key = shared_cache.make_key("reference", reference)
+    version, tenant = await shared_cache.aget(shared_key)
+
+    if tenant is None:
+        tenant = await (
+            TenantModel._default_manager.filter(_tenant_reference_filter(TenantModel, reference))
+            .defer(*get_routing_deferred_fields(TenantModel))
+            .afirst()
+        )
+        if tenant is None:
+            return None
+        await shared_cache.aset(shared_key, version, tenant)
+
+    reference_cache.set(reference, tenant)
+    return hand_out_tenant(tenant)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def routing_cache_invalidation_callback(sender: Any, **kwargs: Any) -> None:
+    if not issubclass(sender, (TenantModel, DomainModel)):
+        return
+    clear_routing_caches()
+    # Requests running concurrently may have cached the previous state
+    transaction.on_commit(clear_routing_caches, using=kwargs.get("using"))
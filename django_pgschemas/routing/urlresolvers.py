@@ -1,22 +1,40 @@
+import importlib.abc
 import re
 import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from importlib.machinery import ModuleSpec
 from types import ModuleType
 from typing import Any, Literal
 
 from django.conf import settings
-from django.urls import URLResolver
+from django.urls import URLResolver, clear_url_caches
 
+from django_pgschemas.routing.index import get_static_routing_index
 from django_pgschemas.routing.info import DomainInfo, HeadersInfo, SessionInfo
 from django_pgschemas.schema import Schema, get_current_schema
+from django_pgschemas.settings import get_folder_urlconf_cache_size
 
 DYNAMIC_URLCONF_SUFFIX = "_dynamically_tenant_prefixed"
 
 
+@lru_cache(maxsize=1024)
+def compile_tenant_prefix(tenant_prefix: str) -> re.Pattern:
+    return re.compile(tenant_prefix)
+
+
 class TenantPrefixPattern:
     converters: dict = {}
 
+    def __init__(self, folder: str | None = None) -> None:
+        self.folder = folder
+        self._tenant_prefix = f"{folder}/" if folder is not None else None
+
     @property
     def tenant_prefix(self) -> str:
+        if self._tenant_prefix is not None:
+            return self._tenant_prefix
         current_schema = get_current_schema()
         return (
             f"{current_schema.routing.folder}/"
@@ -27,10 +45,12 @@ class TenantPrefixPattern:
     @property
     def regex(self) -> re.Pattern:
         # This is only used by reverse() and cached in _reverse_dict.
-        return re.compile(self.tenant_prefix)
+        return compile_tenant_prefix(self.tenant_prefix)
 
     def match(self, path: str) -> tuple | None:
         tenant_prefix = self.tenant_prefix
+        if not tenant_prefix:
+            return path, (), {}
         if path.startswith(tenant_prefix):
             return path[len(tenant_prefix) :], (), {}
         return None
@@ -45,57 +65,135 @@ class TenantPrefixPattern:
         return self.tenant_prefix
 
 
-def get_dynamic_tenant_prefixed_urlconf(urlconf: str, dynamic_path: str) -> ModuleType:
+def get_dynamic_tenant_prefixed_urlconf(
+    urlconf: str, dynamic_path: str, folder: str | None = None
+) -> ModuleType:
     """
-    Generates a new urlconf module with all patterns prefixed with tenant.
+    Generates a new urlconf module with all patterns prefixed with `folder`,
+    or with the folder of the active tenant if not passed.
     """
 
     class LazyURLConfModule(ModuleType):
         def __getattr__(self, attr: str) -> Any:
             if attr == "urlpatterns":
-                return [URLResolver(TenantPrefixPattern(), urlconf)]
+                return [URLResolver(TenantPrefixPattern(folder), urlconf)]
             return self.__getattribute__(attr)
 
     return LazyURLConfModule(dynamic_path)
 
 
+_folder_urlconfs: OrderedDict[str, None] = OrderedDict()
+_folder_urlconfs_lock = threading.Lock()
+_folder_urlconfs_evicted = 0
+
+
+def _register_folder_urlconf(urlconf: str, folder: str, dynamic_path: str) -> ModuleType:
+    global _folder_urlconfs_evicted
+
+    module = get_dynamic_tenant_prefixed_urlconf(urlconf, dynamic_path, folder)
+    cache_size = max(get_folder_urlconf_cache_size(), 1)
+
+    with _folder_urlconfs_lock:
+        sys.modules[dynamic_path] = module
+        _folder_urlconfs[dynamic_path] = None
+        _folder_urlconfs.move_to_end(dynamic_path)
+
+        while len(_folder_urlconfs) > cache_size:
+            path, _ = _folder_urlconfs.popitem(last=False)
+            sys.modules.pop(path, None)
+            _folder_urlconfs_evicted += 1
+
+        # Resolvers of discarded modules are only released by clearing all URL
+        # caches, so it is done once for every `cache_size` discarded modules.
+        clear = _folder_urlconfs_evicted >= cache_size
+        if clear:
+            _folder_urlconfs_evicted = 0
+
+    if clear:
+        clear_url_caches()
+
+    return module
+
+
+def get_folder_urlconf(urlconf: str, folder: str) -> str:
+    """
+    Returns the path of a urlconf module with all patterns of `urlconf`
+    prefixed with `folder`.
+
+    Every folder gets its own module, so that Django keeps warm resolvers and
+    reverse dictionaries per folder. The least recently used modules are
+    discarded past `PGSCHEMAS_FOLDER_URLCONF_CACHE_SIZE`, and rebuilt by
+    `FolderURLConfFinder` if imported again.
+    """
+    dynamic_path = f"{urlconf}{DYNAMIC_URLCONF_SUFFIX}.{folder}"
+
+    with _folder_urlconfs_lock:
+        if dynamic_path in _folder_urlconfs:
+            _folder_urlconfs.move_to_end(dynamic_path)
+            return dynamic_path
+
+    _register_folder_urlconf(urlconf, folder, dynamic_path)
+
+    return dynamic_path
+
+
+class FolderURLConfFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """
+    Rebuilds folder urlconf modules that were discarded from `sys.modules`
+    while a request still holds their path in `request.urlconf`.
+    """
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> ModuleSpec | None:
+        if fullname.endswith(DYNAMIC_URLCONF_SUFFIX):
+            return ModuleSpec(fullname, self, is_package=True)
+        if f"{DYNAMIC_URLCONF_SUFFIX}." in fullname:
+            return ModuleSpec(fullname, self)
+        return None
+
+    def create_module(self, spec: ModuleSpec) -> ModuleType | None:
+        urlconf, _, folder = spec.name.partition(f"{DYNAMIC_URLCONF_SUFFIX}.")
+        if not folder:
+            return None
+        return _register_folder_urlconf(urlconf, folder, spec.name)
+
+    def exec_module(self, module: ModuleType) -> None:
+        pass
+
+
+if not any(isinstance(finder, FolderURLConfFinder) for finder in sys.meta_path):
+    sys.meta_path.append(FolderURLConfFinder())
+
+
 def _get_urlconf_from_schema(
     schema: Schema, config_key: Literal["URLCONF", "WS_URLCONF"]
 ) -> str | None:
+    static_index = get_static_routing_index()
+    urlconfs = static_index.urlconfs if config_key == "URLCONF" else static_index.ws_urlconfs
+
     match schema.routing:
         case DomainInfo(domain, _):
             # Checking for static tenants
             if not schema.is_dynamic:
-                for schema_name, data in settings.TENANTS.items():
-                    if schema_name in ["public", "default"]:
-                        continue
-                    if domain in data.get("DOMAINS", []):
-                        return data.get(config_key)
-                    if domain in data.get("FALLBACK_DOMAINS", []):
-                        return data.get(config_key)
-                return None
+                if (schema_name := static_index.get_any_domain(domain)) is None:
+                    return None
+                return urlconfs[schema_name]
 
             # Checking for dynamic tenants
             urlconf = settings.TENANTS.get("default", {}).get(config_key)
             if urlconf is not None and schema.routing.folder:
-                dynamic_path = urlconf + DYNAMIC_URLCONF_SUFFIX
-                if not sys.modules.get(dynamic_path):
-                    sys.modules[dynamic_path] = get_dynamic_tenant_prefixed_urlconf(
-                        urlconf, dynamic_path
-                    )
-                urlconf = dynamic_path
+                urlconf = get_folder_urlconf(urlconf, schema.routing.folder)
 
             return urlconf
 
         case SessionInfo(_):
             if not schema.is_dynamic:
-                return settings.TENANTS.get(schema.schema_name, {}).get(config_key)
+                return urlconfs.get(schema.schema_name)
 
             return settings.TENANTS.get("default", {}).get(config_key)
 
         case HeadersInfo(_):
             if not schema.is_dynamic:
-                return settings.TENANTS.get(schema.schema_name, {}).get(config_key)
+                return urlconfs.get(schema.schema_name)
 
             return settings.TENANTS.get("default", {}).get(config_key)
 
@@ -1,46 +1,87 @@
 from contextlib import contextmanager
 from contextvars import ContextVar, Token
 from functools import lru_cache
-from typing import Iterator
+from typing import Any, Iterable, Iterator, NoReturn
 
 from django_pgschemas.routing.info import RoutingInfo
 from django_pgschemas.signals import schema_activate
 
 
 class Schema:
+    __slots__ = ()
+
     schema_name: str
     routing: RoutingInfo = None
 
     is_dynamic = False
 
-    _context_tokens: list[Token["Schema"] | None]
-
-    def __init__(self, *args: object, **kwargs: object) -> None:
-        super().__init__(*args, **kwargs)
-        self._context_tokens = []
-
     @staticmethod
     def create(schema_name: str, routing: RoutingInfo | None = None) -> "Schema":
-        from django_pgschemas.utils import check_schema_name
-
-        check_schema_name(schema_name)
-        schema = Schema()
-        schema.schema_name = schema_name
-        schema.routing = routing
-        return schema
+        """
+        Returns the interned handle for `schema_name` and `routing`. The schema
+        name is only validated when the handle is created.
+        """
+        if (schema := _static_schemas.get((schema_name, routing))) is not None:
+            return schema
+        return get_schema_handle(schema_name, routing)
 
     def __enter__(self) -> None:
-        self._context_tokens.append(push(self))
+        _context_tokens.set((*_context_tokens.get(), push(self)))
 
     def __exit__(self, *args: object) -> None:
-        if self._context_tokens:
-            token = self._context_tokens.pop()
-            if token is not None:
+        if tokens := _context_tokens.get():
+            _context_tokens.set(tokens[:-1])
+            if (token := tokens[-1]) is not None:
                 active.reset(token)
 
 
+class SchemaHandle(Schema):
+    """
+    Immutable schema descriptor, as returned by `Schema.create`.
+    """
+
+    __slots__ = ("schema_name", "routing")
+
+    def __init__(self, schema_name: str, routing: RoutingInfo) -> None:
+        object.__setattr__(self, "schema_name", schema_name)
+        object.__setattr__(self, "routing", routing)
+
+    def __setattr__(self, name: str, value: Any) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> NoReturn:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (Schema.create, (self.schema_name, self.routing))
+
+
+@lru_cache(maxsize=4096)
+def get_schema_handle(schema_name: str, routing: RoutingInfo = None) -> SchemaHandle:
+    from django_pgschemas.utils import check_schema_name
+
+    check_schema_name(schema_name)
+    return SchemaHandle(schema_name, routing)
+
+
+_static_schemas: dict[tuple[str, RoutingInfo], Schema] = {}
+
+
+def intern_static_schemas(keys: Iterable[tuple[str, RoutingInfo]]) -> None:
+    """
+    Replaces the handles that are kept regardless of the size of the handle
+    cache, like those of static tenants. Invalid schema names are skipped.
+    """
+    from django_pgschemas.utils import is_valid_schema_name
+
+    global _static_schemas
+    _static_schemas = {key: get_schema_handle(*key) for key in keys if is_valid_schema_name(key[0])}
+
+
 def shallow_equal(schema1: Schema, schema2: Schema) -> bool:
-    return schema1.schema_name == schema2.schema_name and schema1.routing == schema2.routing
+    return schema1 is schema2 or (
+        schema1.schema_name == schema2.schema_name and schema1.routing == schema2.routing
+    )
 
 
 @lru_cache
@@ -50,6 +91,27 @@ def get_default_schema() -> Schema:
 
 active: ContextVar["Schema"] = ContextVar("active_schema", default=get_default_schema())
 
+_context_tokens: ContextVar[tuple[Token[Schema] | None, ...]] = ContextVar(
+    "schema_context_tokens", default=()
+)
+
+
+class _Deferral:
+    "Marks a `defer_activate_signal` block, open until the block exits."
+
+    __slots__ = ("open",)
+
+    def __init__(self) -> None:
+        self.open = True
+
+
+# Schemas activated while `schema_activate` is deferred, as immutable pairs of
+# the latest schema and the previous ones, so that copied contexts don't share
+# them
+_deferred_activations: ContextVar[tuple[_Deferral, tuple[Any, ...]] | None] = ContextVar(
+    "schema_deferred_activations", default=None
+)
+
 
 def get_current_schema() -> Schema:
     return active.get()
@@ -61,7 +123,11 @@ def push(schema: Schema) -> Token[Schema] | None:
 
     token = active.set(schema)
 
-    schema_activate.send(sender=Schema, schema=schema)
+    if (deferred := _deferred_activations.get()) is not None and deferred[0].open:
+        _deferred_activations.set((deferred[0], (schema, deferred[1])))
+    # Checking for receivers first spares building the arguments of `send`
+    elif schema_activate.receivers:
+        schema_activate.send(sender=Schema, schema=schema)
 
     return token
 
@@ -85,3 +151,44 @@ def override(schema: Schema) -> Iterator[None]:
 
     if token is not None:
         active.reset(token)
+
+
+@contextmanager
+def defer_activate_signal() -> Iterator[None]:
+    """
+    Holds `schema_activate` back while in the block. On exit, receivers are
+    notified once if any schema was activated within, with the active schema
+    as `schema` and all schemas activated within as `schemas`.
+    """
+    outer = _deferred_activations.get()
+    deferral = _Deferral()
+    token = _deferred_activations.set((deferral, ()))
+
+    try:
+        yield
+    finally:
+        _, pairs = _deferred_activations.get() or (deferral, ())
+        deferral.open = False
+        _deferred_activations.reset(token)
+
+    activated: list[Schema] = []
+    while pairs:
+        schema, pairs = pairs
+        activated.append(schema)
+    activated.reverse()
+
+    if not activated:
+        return
+
+    if outer is not None and outer[0].open:
+        pairs = outer[1]
+        for schema in activated:
+            pairs = (schema, pairs)
+        _deferred_activations.set((outer[0], pairs))
+    elif schema_activate.receivers:
+        unique: dict[str, Schema] = {}
+        for schema in activated:
+            unique.setdefault(schema.schema_name, schema)
+        schema_activate.send(
+            sender=Schema, schema=get_current_schema(), schemas=tuple(unique.values())
+        )
@@ -17,6 +17,22 @@ def get_limit_set_calls() -> bool:
     return getattr(settings, "PGSCHEMAS_LIMIT_SET_CALLS", False)
 
 
+def get_transaction_pooling() -> bool:
+    return getattr(settings, "PGSCHEMAS_TRANSACTION_POOLING", False)
+
+
+def get_qualified_table_names() -> bool:
+    return getattr(settings, "PGSCHEMAS_QUALIFIED_TABLE_NAMES", False)
+
+
+def get_pool_schema_affinity() -> bool:
+    return getattr(settings, "PGSCHEMAS_POOL_SCHEMA_AFFINITY", False)
+
+
+def get_pipeline_search_path() -> bool:
+    return getattr(settings, "PGSCHEMAS_PIPELINE_SEARCH_PATH", False)
+
+
 def get_original_backend() -> str:
     return getattr(settings, "PGSCHEMAS_ORIGINAL_BACKEND", DEFAULT_BACKEND)
 
@@ -44,6 +60,38 @@ def get_pathname_function() -> Callable | None:
     return getattr(settings, "PGSCHEMAS_PATHNAME_FUNCTION", None)
 
 
+def get_routing_cache_size() -> int:
+    return getattr(settings, "PGSCHEMAS_ROUTING_CACHE_SIZE", 0)
+
+
+def get_routing_cache_ttl() -> float:
+    return getattr(settings, "PGSCHEMAS_ROUTING_CACHE_TTL", 60)
+
+
+def get_folder_urlconf_cache_size() -> int:
+    return getattr(settings, "PGSCHEMAS_FOLDER_URLCONF_CACHE_SIZE", 1000)
+
+
+def get_routing_cache_alias() -> str | None:
+    return getattr(settings, "PGSCHEMAS_ROUTING_CACHE_ALIAS", None)
+
+
+def get_routing_tenant_fields() -> list[str] | None:
+    return getattr(settings, "PGSCHEMAS_ROUTING_TENANT_FIELDS", None)
+
+
+def get_routing_negative_cache_size() -> int:
+    return getattr(settings, "PGSCHEMAS_ROUTING_NEGATIVE_CACHE_SIZE", 0)
+
+
+def get_routing_negative_cache_ttl() -> float:
+    return getattr(settings, "PGSCHEMAS_ROUTING_NEGATIVE_CACHE_TTL", 5)
+
+
+def get_routing_hostname_regex() -> str | None:
+    return getattr(settings, "PGSCHEMAS_ROUTING_HOSTNAME_REGEX", None)
+
+
 def import_backend_module(
     backend: str | Callable[[], str],
     submodule: str | None = None,
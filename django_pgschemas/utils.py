@@ -1,7 +1,8 @@
 import gzip
 import os
 import re
-from typing import Any, Callable
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 
 from django.apps import apps
 from django.conf import settings
@@ -42,15 +43,17 @@ def get_clone_reference() -> str | None:
     return settings.TENANTS["default"].get("CLONE_REFERENCE", None)
 
 
+SQL_IDENTIFIER_RE = re.compile(r"^[_a-zA-Z][_a-zA-Z0-9]{,62}$")
+SQL_SCHEMA_NAME_RESERVED_RE = re.compile(r"^pg_", re.IGNORECASE)
+
+
 def is_valid_identifier(identifier: str) -> bool:
     "Checks the validity of identifier."
-    SQL_IDENTIFIER_RE = re.compile(r"^[_a-zA-Z][_a-zA-Z0-9]{,62}$")
     return bool(SQL_IDENTIFIER_RE.match(identifier))
 
 
 def is_valid_schema_name(name: str) -> bool:
     "Checks the validity of a schema name."
-    SQL_SCHEMA_NAME_RESERVED_RE = re.compile(r"^pg_", re.IGNORECASE)
     return is_valid_identifier(name) and not SQL_SCHEMA_NAME_RESERVED_RE.match(name)
 
 
@@ -87,6 +90,23 @@ def quote_schema_name(schema_name: str) -> str:
     return connection.ops.quote_name(schema_name)
 
 
+T = TypeVar("T")
+
+# Bounds the size and planning time of lookups by many schema names
+SCHEMA_LOOKUP_CHUNK_SIZE = 2000
+
+
+def chunked(iterable: Iterable[T], size: int | None = None) -> Iterator[list[T]]:
+    """
+    Yields lists of at most `size` consecutive items of `iterable`, by default
+    `SCHEMA_LOOKUP_CHUNK_SIZE`.
+    """
+    size = size or SCHEMA_LOOKUP_CHUNK_SIZE
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
 def remove_www(path: str) -> str:
     if path.startswith("www."):
         return path[4:]
@@ -192,6 +212,47 @@ def create_schema(
     return True
 
 
+def get_missing_schemas(schema_names: list[str]) -> list[str]:
+    "Returns the schemas in `schema_names` that don't exist in database, with a single query."
+    sql = """
+    SELECT LOWER(nspname)
+    FROM pg_catalog.pg_namespace
+    WHERE LOWER(nspname) = ANY(%s)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, ([schema_name.lower() for schema_name in schema_names],))
+        existing = {row[0] for row in cursor.fetchall()}
+
+    return [schema_name for schema_name in schema_names if schema_name.lower() not in existing]
+
+
+@run_in_public_schema
+def create_schemas(schema_names: list[str], check_if_exists: bool = False) -> list[str]:
+    """
+    Creates the schemas in `schema_names` in a single round trip, without
+    applying migrations. Optionally skips the schemas that already exist,
+    checked with a single query. Returns the schemas that were created.
+    """
+    schema_names = list(dict.fromkeys(schema_names))
+
+    for schema_name in schema_names:
+        check_schema_name(schema_name)
+
+    if check_if_exists and schema_names:
+        schema_names = get_missing_schemas(schema_names)
+
+    if schema_names:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "; ".join(
+                    "CREATE SCHEMA %s" % quote_schema_name(schema_name)
+                    for schema_name in schema_names
+                )
+            )
+
+    return schema_names
+
+
 @run_in_public_schema
 def drop_schema(schema_name: str, check_if_exists: bool = True, verbosity: int = 1) -> bool:
     """
@@ -0,0 +1,97 @@
+"""
+Compares the thread-hopping and the native async paths of the domain routing
+middleware under concurrency.
+
+    python -m sandbox.benchmarks.async_routing --requests 5000 --concurrency 100
+
+Hostnames of dynamic tenants must exist in the development database.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--path", default="/some/path/")
+    parser.add_argument(
+        "--routing-cache-size",
+        type=int,
+        default=0,
+        help="Value for PGSCHEMAS_ROUTING_CACHE_SIZE during the benchmark",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sandbox.settings")
+
+    import django
+
+    django.setup()
+
+    from django.http import HttpResponse
+    from django.test import AsyncRequestFactory, override_settings
+
+    from django_pgschemas.routing.middleware import aroute_domain, middleware_factory, route_domain
+
+    async def get_response(request):
+        return HttpResponse()
+
+    handlers = {
+        "sync_to_async": middleware_factory(route_domain)(get_response),
+        "native async": middleware_factory(route_domain, aroute_domain)(get_response),
+    }
+    factory = AsyncRequestFactory()
+
+    async def run(handler) -> list[float]:
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies: list[float] = []
+
+        async def one() -> None:
+            request = factory.get(args.path)
+            request.META["HTTP_HOST"] = args.host
+            async with semaphore:
+                start = time.perf_counter()
+                await handler(request)
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one() for _ in range(args.requests)))
+        return latencies
+
+    print(
+        f"{args.requests} requests to {args.host}{args.path}, "
+        f"concurrency {args.concurrency}, best of {args.rounds} rounds"
+    )
+    print(f"{'path':<16}{'req/s':>12}{'mean ms':>12}{'p99 ms':>12}")
+
+    with override_settings(PGSCHEMAS_ROUTING_CACHE_SIZE=args.routing_cache_size):
+        for name, handler in handlers.items():
+            best: tuple[float, list[float]] | None = None
+            for _ in range(args.rounds):
+                start = time.perf_counter()
+                latencies = asyncio.run(run(handler))
+                elapsed = time.perf_counter() - start
+                if best is None or elapsed < best[0]:
+                    best = (elapsed, latencies)
+
+            assert best is not None
+            elapsed, latencies = best
+            p99 = statistics.quantiles(latencies, n=100)[98]
+            print(
+                f"{name:<16}{args.requests / elapsed:>12.0f}"
+                f"{statistics.mean(latencies) * 1000:>12.3f}{p99 * 1000:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
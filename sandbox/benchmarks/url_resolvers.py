@@ -0,0 +1,83 @@
+"""
+Measures resolve() and reverse() for subfolder routing across a number of
+distinct folders, comparing a urlconf per folder with the former shared
+urlconf that needed its URL caches cleared on every request.
+
+    python -m sandbox.benchmarks.url_resolvers --folders 1 100 10000
+"""
+
+import argparse
+import os
+import time
+from typing import Callable
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--folders", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--requests", type=int, default=20000)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "sandbox.settings")
+
+    import django
+
+    django.setup()
+
+    import sys
+
+    from django.conf import settings
+    from django.test import override_settings
+    from django.urls import clear_url_caches, resolve, reverse
+
+    from django_pgschemas.routing.info import DomainInfo
+    from django_pgschemas.routing.urlresolvers import (
+        DYNAMIC_URLCONF_SUFFIX,
+        get_dynamic_tenant_prefixed_urlconf,
+        get_folder_urlconf,
+    )
+    from django_pgschemas.schema import Schema, override
+
+    urlconf = settings.TENANTS["default"]["URLCONF"]
+    shared_path = urlconf + DYNAMIC_URLCONF_SUFFIX
+    sys.modules[shared_path] = get_dynamic_tenant_prefixed_urlconf(urlconf, shared_path)
+
+    def per_folder(folder: str) -> None:
+        folder_urlconf = get_folder_urlconf(urlconf, folder)
+        resolve(f"/{folder}/profile/", urlconf=folder_urlconf)
+        reverse("profile", urlconf=folder_urlconf)
+
+    def shared(folder: str) -> None:
+        schema = Schema.create("public", routing=DomainInfo(domain="localhost", folder=folder))
+        with override(schema):
+            clear_url_caches()
+            resolve(f"/{folder}/profile/", urlconf=shared_path)
+            reverse("profile", urlconf=shared_path)
+
+    print(f"{args.requests} resolve() + reverse() pairs, round robin over folders")
+    print(f"{'folders':>8}  {'urlconf':<12}{'us/request':>12}")
+
+    for folders in args.folders:
+        names = [f"folder{i}" for i in range(folders)]
+        requests = max(args.requests, folders)
+
+        with override_settings(PGSCHEMAS_FOLDER_URLCONF_CACHE_SIZE=folders):
+            candidates: dict[str, Callable[[str], None]] = {
+                "per folder": per_folder,
+                "shared": shared,
+            }
+            for name, run in candidates.items():
+                clear_url_caches()
+                start = time.perf_counter()
+                for i in range(requests):
+                    run(names[i % folders])
+                elapsed = time.perf_counter() - start
+                print(f"{folders:>8}  {name:<12}{elapsed / requests * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
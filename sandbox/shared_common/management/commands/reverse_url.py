@@ -21,5 +21,8 @@ class Command(SchemaCommand):
             primary_domain = get_primary_domain_for_tenant(schema)
             schema.routing = DomainInfo(domain=primary_domain.domain, folder=primary_domain.folder)
         else:
-            schema.routing = DomainInfo(domain=settings.TENANTS[schema.schema_name]["DOMAINS"][0])
+            schema = Schema.create(
+                schema.schema_name,
+                routing=DomainInfo(domain=settings.TENANTS[schema.schema_name]["DOMAINS"][0]),
+            )
         self.stdout.write(reverse(options["url_name"], urlconf=get_urlconf_from_schema(schema)))
@@ -0,0 +1,15 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("shared_public", "0002_domain_redirect_to_primary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tenant",
+            name="config",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -6,7 +6,7 @@ from django_pgschemas.routing.models import DomainModel
 
 
 class Tenant(TenantModel):
-    pass
+    config = models.JSONField(default=dict, blank=True)
 
 
 if settings.TENANTS.get("default", {}).get("DOMAIN_MODEL", None) is not None:
@@ -1,13 +1,28 @@
+import asyncio
+from io import StringIO
 from typing import Any, ClassVar
 from unittest.mock import patch
 
 import pytest
 from django.core import management
 from django.core.management.base import CommandError
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.test.utils import CaptureQueriesContext
 
-from django_pgschemas.management.commands import CommandScope, SchemaCommand
-from django_pgschemas.management.commands._executors import parallel, sequential
-from django_pgschemas.schema import Schema
+from django_pgschemas.management.commands import (
+    CommandScope,
+    SchemaCommand,
+    aget_schema_connection,
+)
+from django_pgschemas.management.commands._executors import (
+    asynchronous,
+    parallel,
+    process,
+    sequential,
+)
+from django_pgschemas.routing.info import DomainInfo
+from django_pgschemas.schema import Schema, get_current_schema
 
 
 class RecordingSchemaCommand(SchemaCommand):
@@ -18,20 +33,56 @@ class RecordingSchemaCommand(SchemaCommand):
     fail_on: ClassVar[set[str]] = set()
     completed: ClassVar[list[str]] = []
     started: ClassVar[list[str]] = []
+    routings: ClassVar[dict[str, Any]] = {}
 
     @classmethod
     def reset(cls, fail_on: set[str] | None = None) -> None:
         cls.fail_on = set(fail_on or ())
         cls.completed = []
         cls.started = []
+        cls.routings = {}
 
     def handle_schema(self, schema: Schema, *args: Any, **options: Any) -> None:
         type(self).started.append(schema.schema_name)
+        type(self).routings[schema.schema_name] = schema.routing
         if schema.schema_name in type(self).fail_on:
             raise RuntimeError(f"boom:{schema.schema_name}")
         type(self).completed.append(schema.schema_name)
 
 
+class EchoSchemaCommand(SchemaCommand):
+    """SchemaCommand that only communicates through its output and errors."""
+
+    scope = CommandScope.STATIC
+    allow_interactive = False
+
+    def handle_schema(self, schema: Schema, *args: Any, **options: Any) -> None:
+        self.stdout.write(f"routing:{schema.routing}")
+        if schema.schema_name in options.get("fail_on", ()):
+            raise RuntimeError(f"boom:{schema.schema_name}")
+
+
+class AsyncSchemaCommand(SchemaCommand):
+    """SchemaCommand with an async handle_schema that queries its schema."""
+
+    scope = CommandScope.STATIC
+    allow_interactive = False
+
+    async def handle_schema(self, schema: Schema, *args: Any, **options: Any) -> None:
+        await asyncio.sleep(0)  # Lets other tasks run in between
+        if schema.schema_name in options.get("fail_on", ()):
+            raise RuntimeError(f"boom:{schema.schema_name}")
+        conn = await aget_schema_connection()
+        cursor = await conn.execute("SHOW search_path")
+        (search_path,) = await cursor.fetchone()
+        self.stdout.write(f"{get_current_schema().schema_name}:{search_path}")
+
+
+class TTYStringIO(StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
 @pytest.fixture(autouse=True)
 def _reset_recording_command():
     RecordingSchemaCommand.reset()
@@ -139,3 +190,171 @@ def test_parallel_via_call_command_surfaces_failure():
     assert "boom:blog" in str(ctx.value)
     assert set(RecordingSchemaCommand.started) == {"www", "blog"}
     assert RecordingSchemaCommand.completed == ["www"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("executor", [sequential, parallel])
+def test_tenants_are_prefetched(executor, tenant1, tenant2, TenantModel):
+    if TenantModel is None:
+        pytest.skip("Dynamic tenants are not in use")
+
+    with CaptureQueriesContext(connection) as context:
+        executor(
+            ["www", "tenant1", "tenant2"],
+            RecordingSchemaCommand(),
+            "_raw_handle_schema",
+            args=[],
+            kwargs={},
+            pass_schema_in_kwargs=True,
+        )
+
+    tenant_queries = [query for query in context if TenantModel._meta.db_table in query["sql"]]
+
+    assert len(tenant_queries) <= 2
+    assert set(RecordingSchemaCommand.completed) == {"www", "tenant1", "tenant2"}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("executor", [sequential, parallel])
+def test_primary_domains_are_prefetched(executor, tenant1, tenant2, DomainModel):
+    if DomainModel is None:
+        pytest.skip("Domain model is not in use")
+
+    DomainModel.objects.create(tenant=tenant1, domain="tenants.localhost", folder="tenant1")
+
+    with patch(
+        "django_pgschemas.management.commands._executors.get_primary_domain_for_tenant"
+    ) as get_primary_domain_for_tenant:
+        executor(
+            ["www", "tenant1", "tenant2"],
+            RecordingSchemaCommand(),
+            "_raw_handle_schema",
+            args=[],
+            kwargs={},
+            pass_schema_in_kwargs=True,
+        )
+
+    get_primary_domain_for_tenant.assert_not_called()
+    assert RecordingSchemaCommand.routings == {
+        "www": DomainInfo(domain="localhost"),
+        "tenant1": DomainInfo(domain="tenants.localhost", folder="tenant1"),
+        "tenant2": None,
+    }
+
+
+def test_process_writes_prefixed_output(settings):
+    settings.PGSCHEMAS_PARALLEL_MAX_THREADS = 2
+    stdout = TTYStringIO()
+
+    process(
+        ["www", "blog"],
+        EchoSchemaCommand(stdout=stdout),
+        "_raw_handle_schema",
+        args=[],
+        kwargs={},
+        pass_schema_in_kwargs=True,
+    )
+
+    assert sorted(stdout.getvalue().splitlines()) == [
+        "[process:blog] routing:blog.localhost",
+        "[process:www] routing:localhost",
+    ]
+
+
+def test_process_raises_command_error_for_failures(settings):
+    settings.PGSCHEMAS_PARALLEL_MAX_THREADS = 2
+    stdout = StringIO()
+
+    with pytest.raises(CommandError) as ctx:
+        process(
+            ["www", "blog"],
+            EchoSchemaCommand(stdout=stdout),
+            "_raw_handle_schema",
+            args=[],
+            kwargs={"fail_on": ["blog"]},
+            pass_schema_in_kwargs=True,
+        )
+
+    assert "schema blog" in str(ctx.value)
+    assert str(ctx.value.__cause__) == "boom:blog"
+    assert sorted(stdout.getvalue().splitlines()) == [
+        "routing:blog.localhost",
+        "routing:localhost",
+    ]
+
+
+@pytest.mark.parametrize(
+    "options, executor",
+    [
+        ({}, sequential),
+        ({"parallel": True}, parallel),
+        ({"executor": "process"}, process),
+        ({"executor": "sequential", "parallel": True}, sequential),
+    ],
+)
+def test_get_executor_from_options(options, executor):
+    assert EchoSchemaCommand().get_executor_from_options(**options) is executor
+
+
+def test_get_executor_from_options_async():
+    assert AsyncSchemaCommand().get_executor_from_options(parallel=True) is asynchronous
+
+    with pytest.raises(CommandError):
+        AsyncSchemaCommand().get_executor_from_options(executor="sequential")
+
+    with pytest.raises(CommandError):
+        EchoSchemaCommand().get_executor_from_options(executor="asyncio")
+
+
+@pytest.mark.skipif(not is_psycopg3, reason="Requires psycopg 3")
+@pytest.mark.django_db
+def test_asyncio_runs_tasks_in_their_schema(settings):
+    settings.PGSCHEMAS_PARALLEL_MAX_THREADS = 2
+    stdout = TTYStringIO()
+
+    asynchronous(
+        ["public", "www", "blog"],
+        AsyncSchemaCommand(stdout=stdout),
+        "_raw_handle_schema",
+        args=[],
+        kwargs={},
+        pass_schema_in_kwargs=True,
+    )
+
+    assert sorted(stdout.getvalue().splitlines()) == [
+        "[asyncio:blog] blog:blog, public",
+        "[asyncio:public] public:public",
+        "[asyncio:www] www:www, public",
+    ]
+
+
+@pytest.mark.skipif(not is_psycopg3, reason="Requires psycopg 3")
+@pytest.mark.django_db
+def test_asyncio_raises_command_error_for_failures():
+    stdout = StringIO()
+
+    with pytest.raises(CommandError) as ctx:
+        asynchronous(
+            ["www", "blog"],
+            AsyncSchemaCommand(stdout=stdout),
+            "_raw_handle_schema",
+            args=[],
+            kwargs={"fail_on": ["blog"]},
+            pass_schema_in_kwargs=True,
+        )
+
+    assert str(ctx.value.__cause__) == "boom:blog"
+    assert stdout.getvalue() == "www:www, public\n"
+
+
+def test_asyncio_requires_psycopg3():
+    with patch("django_pgschemas.management.commands._executors.is_psycopg3", False):
+        with pytest.raises(CommandError, match="requires psycopg 3"):
+            asynchronous(
+                ["www"],
+                AsyncSchemaCommand(stdout=StringIO()),
+                "_raw_handle_schema",
+                args=[],
+                kwargs={},
+                pass_schema_in_kwargs=True,
+            )
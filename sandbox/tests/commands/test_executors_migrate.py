@@ -74,3 +74,9 @@ def test_all_schemas_in_parallel(many_tenants):
     management.call_command("migrate", all_schemas=True, parallel=True, verbosity=0)
     assert _migration_count("tenant11") > 0
     assert _migration_count("tenant20") > 0
+
+
+def test_all_schemas_in_process(many_tenants):
+    management.call_command("migrate", all_schemas=True, executor="process", verbosity=0)
+    assert _migration_count("tenant11") > 0
+    assert _migration_count("tenant20") > 0
@@ -1,5 +1,9 @@
 import pytest
 from django.core import management
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from django_pgschemas.management.commands.whowill import Command as WhoWillCommand
 
 
 @pytest.fixture(autouse=True)
@@ -144,3 +148,64 @@ def test_specific_schemas_minus_one(DomainModel, stdout):
     expected_dynamic = {"tenant1.localhost"} if DomainModel else {"tenant1"}
 
     assert split_output(stdout) == {"blog.localhost"} | expected_dynamic
+
+
+def test_schema_file(DomainModel, stdout, tmp_path):
+    schema_file = tmp_path / "schemas.txt"
+    schema_file.write_text("# Some schemas\nblog\n\ntenant1\n")
+
+    management.call_command("whowill", schema_file=str(schema_file), schemas=["www"], stdout=stdout)
+
+    expected_dynamic = {"tenant1.localhost"} if DomainModel else {"tenant1"}
+
+    assert split_output(stdout) == {"localhost", "blog.localhost"} | expected_dynamic
+
+
+def test_schema_file_missing(tmp_path):
+    with pytest.raises(management.CommandError, match="Unable to read schema file"):
+        management.call_command("whowill", schema_file=str(tmp_path / "missing.txt"))
+
+
+def test_references_resolved_together(TenantModel, DomainModel):
+    if DomainModel is None:
+        pytest.skip("Domain model is not in use")
+
+    with CaptureQueriesContext(connection) as context:
+        schemas = WhoWillCommand().get_schemas_from_options(
+            schemas=["www", "tenant1", "tenant2", "tenant3.localhost", "tenant2.local"],
+            excluded_schemas=["tenant1", "tenant2.localhost"],
+            skip_schema_creation=True,
+        )
+
+    tenant_queries = [
+        query["sql"]
+        for query in context
+        if TenantModel._meta.db_table in query["sql"] and "information_schema" not in query["sql"]
+    ]
+
+    assert sorted(schemas) == ["tenant3", "www"]
+    assert len(tenant_queries) == 2
+
+
+def test_references_resolved_in_chunks(TenantModel, DomainModel, monkeypatch):
+    if DomainModel is None:
+        pytest.skip("Domain model is not in use")
+
+    monkeypatch.setattr("django_pgschemas.utils.SCHEMA_LOOKUP_CHUNK_SIZE", 2)
+
+    with CaptureQueriesContext(connection) as context:
+        schemas = WhoWillCommand().get_schemas_from_options(
+            schemas=["www", "tenant1", "tenant2", "tenant3.localhost", "tenant2.local"],
+            excluded_schemas=["tenant1", "tenant2.localhost"],
+            skip_schema_creation=True,
+        )
+
+    tenant_queries = [
+        query["sql"]
+        for query in context
+        if TenantModel._meta.db_table in query["sql"] and "information_schema" not in query["sql"]
+    ]
+
+    assert sorted(schemas) == ["tenant3", "www"]
+    # Three chunks of exact references, then two of domain prefixes
+    assert len(tenant_queries) == 5
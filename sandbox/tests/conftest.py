@@ -31,6 +31,25 @@ def tenants_settings(request, settings):
     settings.TENANTS.update(current)
 
 
+@pytest.fixture(autouse=True)
+def _clear_routing_caches():
+    from django_pgschemas.routing.cache import clear_routing_caches
+
+    # Test transactions are rolled back without signals, so caches must not outlive a test
+    clear_routing_caches()
+    yield
+    clear_routing_caches()
+
+
+@pytest.fixture(autouse=True)
+def _reset_urlconf():
+    from django.urls import set_urlconf
+
+    # Middleware called directly set the urlconf without finishing the request
+    yield
+    set_urlconf(None)
+
+
 @pytest.fixture
 def TenantModel():
     from django_pgschemas.utils import get_tenant_model
@@ -0,0 +1,79 @@
+from unittest.mock import patch
+
+from django_pgschemas.routing.cache import ExpiringLRUCache, RejectionCounter
+
+
+def make_cache(maxsize: int = 2, ttl: float = 60) -> ExpiringLRUCache:
+    return ExpiringLRUCache(lambda: maxsize, lambda: ttl)
+
+
+def test_cache_get_and_set():
+    cache = make_cache()
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.info().hits == 1
+    assert cache.info().misses == 1
+
+
+def test_cache_get_any():
+    cache = make_cache()
+    cache.set("b", 2)
+
+    assert cache.get_any(["a", "b"]) == 2
+    assert cache.get_any(["a", "c"]) is None
+    assert cache.info().hits == 1
+    assert cache.info().misses == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = make_cache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.info().currsize == 2
+
+
+def test_cache_expires_entries():
+    cache = make_cache(ttl=10)
+
+    with patch("django_pgschemas.routing.cache.time.monotonic", return_value=100):
+        cache.set("a", 1)
+
+    with patch("django_pgschemas.routing.cache.time.monotonic", return_value=105):
+        assert cache.get("a") == 1
+
+    with patch("django_pgschemas.routing.cache.time.monotonic", return_value=111):
+        assert cache.get("a") is None
+
+    assert cache.info().currsize == 0
+
+
+def test_cache_disabled():
+    cache = make_cache(maxsize=0)
+    cache.set("a", 1)
+
+    assert not cache.enabled
+    assert cache.get("a") is None
+    assert cache.info() == (0, 0, 0, 0)
+
+
+def test_rejection_counter():
+    counter = RejectionCounter(maxsize=2)
+
+    for hostname in ["a", "b", "a", "c", "a"]:
+        counter.add(hostname)
+
+    assert counter.total == 5
+    assert counter.most_common() == [("a", 3), ("b", 1)]
+
+    counter.clear()
+
+    assert counter.total == 0
+    assert counter.most_common() == []
@@ -0,0 +1,64 @@
+from copy import deepcopy
+
+from django.test import override_settings
+
+from django_pgschemas.routing.index import StaticRoutingIndex, get_static_routing_index
+
+
+def test_build(tenants_settings):
+    index = StaticRoutingIndex.build(tenants_settings)
+
+    assert dict(index.domains) == {"localhost": "www", "blog.localhost": "blog"}
+    assert dict(index.fallback_domains) == {"tenants.localhost": "www"}
+    assert dict(index.headers) == {"www": "www", "main": "www", "blog": "blog"}
+    assert dict(index.session_keys) == {"www": "www", "main": "www", "blog": "blog"}
+    assert dict(index.urlconfs) == {
+        "www": "sandbox.app_main.urls",
+        "blog": "sandbox.app_blog.urls",
+    }
+    assert dict(index.ws_urlconfs) == {"www": "sandbox.app_main.ws_urls", "blog": None}
+
+
+def test_build_first_tenant_wins():
+    index = StaticRoutingIndex.build(
+        {
+            "public": {},
+            "first": {"DOMAINS": ["shared.localhost"], "HEADER": "second"},
+            "second": {"DOMAINS": ["shared.localhost"]},
+        }
+    )
+
+    assert index.domains["shared.localhost"] == "first"
+    assert index.headers["second"] == "first"
+
+
+def test_rebuilt_on_setting_changed(tenants_settings):
+    tenants = deepcopy(tenants_settings)
+    tenants["blog"]["DOMAINS"] = ["news.localhost"]
+
+    with override_settings(TENANTS=tenants):
+        assert "news.localhost" in get_static_routing_index().domains
+        assert "blog.localhost" not in get_static_routing_index().domains
+
+    assert "blog.localhost" in get_static_routing_index().domains
+
+
+def test_wildcard_domains():
+    index = StaticRoutingIndex.build(
+        {
+            "public": {},
+            "www": {"DOMAINS": ["*.example.com", "exact.example.com"]},
+            "blog": {"DOMAINS": ["blog.example.com"], "FALLBACK_DOMAINS": ["*.blog.example.com"]},
+            "default": {"DOMAINS": ["*.tenants.example.com"]},
+        }
+    )
+
+    assert index.get_domain("exact.example.com") == "www"
+    assert index.get_domain("any.example.com") == "www"
+    assert index.get_domain("blog.example.com") == "blog"
+    assert index.get_domain("example.com") is None
+    assert index.get_domain("deep.any.example.com") is None
+    assert index.get_fallback_domain("any.blog.example.com") == "blog"
+    assert index.get_any_domain("any.blog.example.com") == "blog"
+    assert index.get_dynamic_wildcard_schema_name("tenant1.tenants.example.com") == "tenant1"
+    assert index.get_dynamic_wildcard_schema_name("tenants.example.com") is None
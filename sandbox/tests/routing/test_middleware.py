@@ -1,10 +1,22 @@
+from copy import deepcopy
 from itertools import permutations
 from unittest.mock import MagicMock
 
 import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import caches
 from django.core.signals import request_finished
-from django.http import Http404
-
+from django.db import connection
+from django.http import Http404, HttpResponse
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from django_pgschemas.routing.cache import (
+    deferred_tenants,
+    domain_cache,
+    negative_domain_cache,
+    rejected_hostnames,
+)
 from django_pgschemas.routing.info import DomainInfo, HeadersInfo, SessionInfo
 from django_pgschemas.routing.middleware import (
     DomainRoutingMiddleware,
@@ -29,6 +41,19 @@ def test_strip_tenant_from_path_factory(path, prefix, expected):
     assert actual == expected
 
 
+def routing_queries(context: CaptureQueriesContext) -> list[str]:
+    return [
+        query["sql"]
+        for query in context
+        if not query["sql"].startswith(("SET search_path", "SET LOCAL search_path"))
+    ]
+
+
+class FakeSession(dict):
+    async def aget(self, key: str, default: object = None) -> object:
+        return self.get(key, default)
+
+
 class FakeRequest:
     def __init__(
         self,
@@ -48,9 +73,9 @@ class FakeRequest:
 
     @property
     def session(self) -> dict:
-        return {
-            "tenant": self.session_tenant_ref,
-        }
+        return FakeSession(
+            tenant=self.session_tenant_ref,
+        )
 
     @property
     def headers(self) -> dict:
@@ -118,6 +143,25 @@ class TestDomainRoutingMiddleware:
             assert request.tenant.routing.domain == domain
             assert request.tenant.routing.folder == (path if path else None)
 
+    @pytest.mark.parametrize(
+        "domain, path, schema_name, folder",
+        [
+            ("tenants.localhost", "/tenant1/some/path/", "tenant1", "tenant1"),
+            ("tenant1.localhost", "/some/path/", "tenant1", None),
+            ("tenant2.localhost", "/unknown/some/path/", "tenant2", None),
+        ],
+    )
+    def test_single_query(self, domain, path, schema_name, folder):
+        request = FakeRequest(domain=domain, path=path)
+
+        with CaptureQueriesContext(connection) as context:
+            DomainRoutingMiddleware(MagicMock())(request)
+
+        assert len(routing_queries(context)) == 1
+
+        assert request.tenant.schema_name == schema_name
+        assert request.tenant.routing.folder == folder
+
 
 class TestDomainRoutingMiddlewareRedirection:
     @pytest.fixture(autouse=True)
@@ -184,13 +228,351 @@ class TestDomainRoutingMiddlewareRedirection:
         request = FakeRequest(domain=domain, path=path)
         get_response = MagicMock()
 
-        response = DomainRoutingMiddleware(get_response)(request)
+        with CaptureQueriesContext(connection) as context:
+            response = DomainRoutingMiddleware(get_response)(request)
+
+        assert len(routing_queries(context)) == 1
 
         assert response.status_code == 301
         assert response.url == expected_redirection
         assert response["Location"] == expected_redirection
 
 
+class TestDomainRoutingCache:
+    @pytest.fixture(autouse=True)
+    def _setup(self, settings, tenant1, DomainModel):
+        if DomainModel is None:
+            pytest.skip("Domain model is not in use")
+
+        settings.PGSCHEMAS_ROUTING_CACHE_SIZE = 10
+        domain_cache.reset_stats()
+
+        DomainModel.objects.create(tenant=tenant1, domain="tenant1.localhost")
+        DomainModel.objects.create(tenant=tenant1, domain="tenants.localhost", folder="tenant1")
+
+    @pytest.mark.parametrize(
+        "domain, path, folder",
+        [
+            ("tenant1.localhost", "/some/path/", None),
+            ("tenants.localhost", "/tenant1/some/path/", "tenant1"),
+        ],
+    )
+    def test_cached_resolution(self, domain, path, folder, django_assert_num_queries):
+        handler = DomainRoutingMiddleware(MagicMock())
+
+        handler(FakeRequest(domain=domain, path=path))
+
+        with django_assert_num_queries(0):
+            request = FakeRequest(domain=domain, path=path)
+            handler(request)
+
+        assert request.tenant.schema_name == "tenant1"
+        assert request.tenant.routing.domain == domain
+        assert request.tenant.routing.folder == folder
+        assert domain_cache.info().hits == 1
+        assert domain_cache.info().misses == 1
+
+    def test_tenant_is_not_shared_between_requests(self):
+        handler = DomainRoutingMiddleware(MagicMock())
+        request1 = FakeRequest(domain="tenant1.localhost", path="/some/path/")
+        request2 = FakeRequest(domain="tenant1.localhost", path="/some/path/")
+
+        handler(request1)
+        handler(request2)
+
+        assert request1.tenant == request2.tenant
+        assert request1.tenant is not request2.tenant
+
+    def test_invalidation_on_domain_change(self, DomainModel):
+        handler = DomainRoutingMiddleware(MagicMock())
+        handler(FakeRequest(domain="tenant1.localhost", path="/some/path/"))
+
+        assert domain_cache.info().currsize == 1
+
+        DomainModel.objects.filter(domain="tenant1.localhost").get().delete()
+
+        assert domain_cache.info().currsize == 0
+
+    def test_invalidation_on_tenant_change(self, tenant1):
+        handler = DomainRoutingMiddleware(MagicMock())
+        handler(FakeRequest(domain="tenant1.localhost", path="/some/path/"))
+
+        assert domain_cache.info().currsize == 1
+
+        tenant1.save()
+
+        assert domain_cache.info().currsize == 0
+
+
+class TestDomainRoutingNegativeCache:
+    @pytest.fixture(autouse=True)
+    def _setup(self, settings, tenant1, DomainModel):
+        if DomainModel is None:
+            pytest.skip("Domain model is not in use")
+
+        settings.PGSCHEMAS_ROUTING_NEGATIVE_CACHE_SIZE = 10
+        rejected_hostnames.clear()
+
+        DomainModel.objects.create(tenant=tenant1, domain="tenants.localhost", folder="tenant1")
+
+    def test_unknown_hostname(self):
+        handler = DomainRoutingMiddleware(MagicMock())
+        negative_domain_cache.reset_stats()
+
+        with CaptureQueriesContext(connection) as context:
+            with pytest.raises(Http404):
+                handler(FakeRequest(domain="unknown.localhost", path="/some/path/"))
+
+        assert len(routing_queries(context)) == 1
+
+        with CaptureQueriesContext(connection) as context:
+            with pytest.raises(Http404):
+                handler(FakeRequest(domain="unknown.localhost", path="/other/path/"))
+
+        assert routing_queries(context) == []
+        assert rejected_hostnames.total == 2
+        assert rejected_hostnames.most_common() == [("unknown.localhost", 2)]
+        assert negative_domain_cache.info()[:2] == (1, 1)
+
+    def test_unknown_folder(self):
+        handler = DomainRoutingMiddleware(MagicMock())
+        request = FakeRequest(domain="tenants.localhost", path="/unknown/some/path/")
+
+        with CaptureQueriesContext(connection) as context:
+            handler(request)
+
+        assert len(routing_queries(context)) == 1
+
+        with CaptureQueriesContext(connection) as context:
+            handler(FakeRequest(domain="tenants.localhost", path="/unknown/some/path/"))
+
+        assert routing_queries(context) == []
+        assert request.tenant.schema_name == "www"  # fallback domains
+
+        request = FakeRequest(domain="tenants.localhost", path="/tenant1/some/path/")
+        handler(request)
+
+        assert request.tenant.schema_name == "tenant1"
+        assert rejected_hostnames.total == 0
+
+    def test_invalidation_on_domain_change(self, tenant1, DomainModel):
+        handler = DomainRoutingMiddleware(MagicMock())
+
+        with pytest.raises(Http404):
+            handler(FakeRequest(domain="tenant1.localhost", path="/some/path/"))
+
+        DomainModel.objects.create(tenant=tenant1, domain="tenant1.localhost")
+        request = FakeRequest(domain="tenant1.localhost", path="/some/path/")
+        handler(request)
+
+        assert request.tenant.schema_name == "tenant1"
+
+    @pytest.mark.parametrize(
+        "domain, path, schema_name",
+        [
+            ("unknown.example.com", "/some/path/", None),
+            ("tenants.example.com", "/tenant1/some/path/", None),
+            ("tenants.localhost", "/tenant1/some/path/", "tenant1"),
+            ("tenants.localhost", "/some/path/", "www"),
+            ("localhost", "/some/path/", "www"),
+        ],
+    )
+    def test_hostname_regex(self, settings, domain, path, schema_name):
+        settings.PGSCHEMAS_ROUTING_HOSTNAME_REGEX = r"([a-z0-9-]+\.)*localhost"
+        handler = DomainRoutingMiddleware(MagicMock())
+        request = FakeRequest(domain=domain, path=path)
+
+        if schema_name is None:
+            with CaptureQueriesContext(connection) as context:
+                with pytest.raises(Http404):
+                    handler(request)
+
+            assert routing_queries(context) == []
+            assert rejected_hostnames.most_common() == [(domain, 1)]
+        else:
+            handler(request)
+
+            assert request.tenant.schema_name == schema_name
+
+
+class TestSharedRoutingCache:
+    @pytest.fixture(autouse=True)
+    def _setup(self, settings, tenant1, DomainModel):
+        if DomainModel is None:
+            pytest.skip("Domain model is not in use")
+
+        settings.PGSCHEMAS_ROUTING_CACHE_ALIAS = "default"
+        settings.PGSCHEMAS_ROUTING_CACHE_SIZE = 10
+        caches["default"].clear()
+
+        DomainModel.objects.create(tenant=tenant1, domain="tenant1.localhost")
+
+    def route_domain(self, handler):
+        request = FakeRequest(domain="tenant1.localhost", path="/some/path/")
+        with CaptureQueriesContext(connection) as context:
+            handler(request)
+        assert request.tenant.schema_name == "tenant1"
+        return routing_queries(context)
+
+    def test_domain_routing(self):
+        handler = DomainRoutingMiddleware(MagicMock())
+
+        assert len(self.route_domain(handler)) == 1
+
+        domain_cache.clear()  # As if in another process
+
+        assert self.route_domain(handler) == []
+
+    def test_domain_routing_invalidation(self, tenant1, DomainModel):
+        handler = DomainRoutingMiddleware(MagicMock())
+        self.route_domain(handler)
+
+        with tenant1:
+            DomainModel.objects.create(tenant=tenant1, domain="tenant1.example.com")
+
+        assert len(self.route_domain(handler)) == 1
+
+    def test_async_domain_routing(self):
+        handler = DomainRoutingMiddleware(MagicMock())
+        async_handler = DomainRoutingMiddleware(TestAsyncRoutingMiddleware.get_response)
+        self.route_domain(handler)
+        domain_cache.clear()
+
+        request = FakeRequest(domain="tenant1.localhost", path="/some/path/")
+        with CaptureQueriesContext(connection) as context:
+            async_to_sync(async_handler)(request)
+
+        assert routing_queries(context) == []
+        assert request.tenant.schema_name == "tenant1"
+
+    def test_headers_routing(self, tenant1):
+        handler = HeadersRoutingMiddleware(MagicMock())
+
+        for expected_queries in [1, 0]:
+            request = FakeRequest(headers_tenant_ref="tenant1")
+            with CaptureQueriesContext(connection) as context:
+                handler(request)
+
+            assert len(routing_queries(context)) == expected_queries
+            assert request.tenant == tenant1
+            assert request.tenant.routing == HeadersInfo(reference="tenant1")
+
+        tenant1.save()
+
+        with CaptureQueriesContext(connection) as context:
+            handler(FakeRequest(headers_tenant_ref="tenant1"))
+
+        assert len(routing_queries(context)) == 1
+
+
+class TestRoutingTenantFields:
+    @pytest.fixture(autouse=True)
+    def _setup(self, settings, tenant1, DomainModel):
+        if DomainModel is None:
+            pytest.skip("Domain model is not in use")
+
+        settings.PGSCHEMAS_ROUTING_TENANT_FIELDS = []
+        deferred_tenants.clear()
+
+        DomainModel.objects.create(tenant=tenant1, domain="tenant1.localhost")
+
+    @pytest.mark.parametrize(
+        "request_kwargs, middleware",
+        [
+            ({"domain": "tenant1.localhost", "path": "/some/path/"}, DomainRoutingMiddleware),
+            ({"headers_tenant_ref": "tenant1"}, HeadersRoutingMiddleware),
+        ],
+    )
+    def test_deferred_fields(self, request_kwargs, middleware):
+        request = FakeRequest(**request_kwargs)
+        middleware(MagicMock())(request)
+
+        assert request.tenant.get_deferred_fields() == {"config"}
+        assert deferred_tenants.deferred == 1
+        assert deferred_tenants.never_loaded == 1
+
+        with CaptureQueriesContext(connection) as context:
+            assert request.tenant.config == {}
+            assert request.tenant.get_deferred_fields() == set()
+
+        assert len(routing_queries(context)) == 1
+
+        assert deferred_tenants.loaded == 1
+        assert deferred_tenants.never_loaded == 0
+
+    def test_all_fields_by_default(self, settings):
+        del settings.PGSCHEMAS_ROUTING_TENANT_FIELDS
+        request = FakeRequest(headers_tenant_ref="tenant1")
+        HeadersRoutingMiddleware(MagicMock())(request)
+
+        assert request.tenant.get_deferred_fields() == set()
+        assert deferred_tenants.deferred == 0
+
+
+class TestWildcardDomainRouting:
+    @pytest.fixture(autouse=True)
+    def _setup(self, tenants_settings, tenant1, tenant2, DomainModel):
+        tenants = deepcopy(tenants_settings)
+        tenants["blog"]["DOMAINS"].append("*.blog.example.com")
+        if "default" in tenants:
+            tenants["default"]["DOMAINS"] = ["*.tenants.example.com"]
+
+        if DomainModel is not None:
+            DomainModel.objects.create(tenant=tenant2, domain="*.custom.localhost")
+            DomainModel.objects.create(tenant=tenant1, domain="tenant1.custom.localhost")
+
+        with override_settings(TENANTS=tenants):
+            yield
+
+    @pytest.mark.parametrize(
+        "domain, schema_name, num_queries",
+        [
+            ("tenant1.tenants.example.com", "tenant1", 1),
+            ("tenant2.tenants.example.com", "tenant2", 1),
+            ("news.blog.example.com", "blog", 0),
+            ("blog.localhost", "blog", 0),
+        ],
+    )
+    def test_wildcard_domains(self, tenants_settings, domain, schema_name, num_queries):
+        if "tenants" in domain and "default" not in tenants_settings:
+            pytest.skip("Dynamic tenants are not in use")
+
+        request = FakeRequest(domain=domain, path="/some/path/")
+
+        with CaptureQueriesContext(connection) as context:
+            DomainRoutingMiddleware(MagicMock())(request)
+
+        assert len(routing_queries(context)) == num_queries
+        assert request.tenant.schema_name == schema_name
+        assert request.tenant.routing == DomainInfo(domain=domain)
+
+    @pytest.mark.parametrize(
+        "domain",
+        ["unknown.tenants.example.com", "tenant1.tenant1.tenants.example.com", "blog.example.com"],
+    )
+    def test_wildcard_domains_not_found(self, domain):
+        with pytest.raises(Http404):
+            DomainRoutingMiddleware(MagicMock())(FakeRequest(domain=domain, path="/some/path/"))
+
+    @pytest.mark.parametrize(
+        "domain, schema_name",
+        [
+            ("tenant1.custom.localhost", "tenant1"),
+            ("tenant2.custom.localhost", "tenant2"),
+            ("anything.custom.localhost", "tenant2"),
+        ],
+    )
+    def test_wildcard_domain_model(self, DomainModel, domain, schema_name):
+        if DomainModel is None:
+            pytest.skip("Domain model is not in use")
+
+        request = FakeRequest(domain=domain, path="/some/path/")
+        DomainRoutingMiddleware(MagicMock())(request)
+
+        assert request.tenant.schema_name == schema_name
+        assert request.tenant.routing == DomainInfo(domain=domain)
+
+
 class TestSessionRoutingMiddleware:
     @pytest.mark.parametrize(
         "session_key, schema_name, expected_urlconf",
@@ -295,6 +677,68 @@ class TestHeadersRoutingMiddleware:
         assert get_current_schema().schema_name == get_default_schema().schema_name
 
 
+class TestAsyncRoutingMiddleware:
+    @pytest.fixture(autouse=True)
+    def _setup(self, tenant1, DomainModel):
+        if DomainModel is None:
+            pytest.skip("Domain model is not in use")
+
+        DomainModel.objects.create(tenant=tenant1, domain="tenant1.localhost")
+        DomainModel.objects.create(tenant=tenant1, domain="tenants.localhost", folder="tenant1")
+
+    @staticmethod
+    async def get_response(request):
+        return HttpResponse(get_current_schema().schema_name)
+
+    @pytest.mark.parametrize(
+        "domain, path, schema_name",
+        [
+            ("tenant1.localhost", "", "tenant1"),
+            ("tenants.localhost", "tenant1", "tenant1"),
+            ("localhost", "", "www"),
+            ("tenants.localhost", "", "www"),  # fallback domains
+        ],
+    )
+    def test_domain_routing(self, domain, path, schema_name):
+        request = FakeRequest(domain=domain, path=f"/{path}/some/path/")
+        handler = DomainRoutingMiddleware(self.get_response)
+
+        assert iscoroutinefunction(handler)
+
+        response = async_to_sync(handler)(request)
+
+        assert response.content.decode() == schema_name
+        assert request.tenant.schema_name == schema_name
+        assert request.tenant.routing == DomainInfo(domain=domain, folder=path or None)
+
+    def test_domain_routing_not_found(self):
+        request = FakeRequest(domain="tenant3.localhost", path="/some/path/")
+        handler = DomainRoutingMiddleware(self.get_response)
+
+        with pytest.raises(Http404):
+            async_to_sync(handler)(request)
+
+    @pytest.mark.parametrize("reference, schema_name", [("main", "www"), ("tenant1", "tenant1")])
+    def test_session_routing(self, reference, schema_name):
+        request = FakeRequest(session_tenant_ref=reference)
+        handler = SessionRoutingMiddleware(self.get_response)
+
+        response = async_to_sync(handler)(request)
+
+        assert response.content.decode() == schema_name
+        assert request.tenant.routing == SessionInfo(reference=reference)
+
+    @pytest.mark.parametrize("reference, schema_name", [("main", "www"), ("tenant1", "tenant1")])
+    def test_headers_routing(self, reference, schema_name):
+        request = FakeRequest(headers_tenant_ref=reference)
+        handler = HeadersRoutingMiddleware(self.get_response)
+
+        response = async_to_sync(handler)(request)
+
+        assert response.content.decode() == schema_name
+        assert request.tenant.routing == HeadersInfo(reference=reference)
+
+
 @pytest.mark.parametrize(
     "first_middleware, second_middleware, last_middleware",
     permutations([DomainRoutingMiddleware, SessionRoutingMiddleware, HeadersRoutingMiddleware]),
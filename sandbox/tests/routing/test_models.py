@@ -1,6 +1,13 @@
 import pytest
-
-from django_pgschemas.routing.models import get_primary_domain_for_tenant
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from django_pgschemas.routing.models import (
+    find_tenant_by_reference,
+    get_primary_domain_for_tenant,
+    get_primary_domains_for_schemas,
+    resolve_domain,
+)
 
 
 @pytest.fixture(autouse=True)
@@ -96,3 +103,85 @@ def test_get_primary_domain_for_tenant(tenant1, is_primary, DomainModel):
         assert get_primary_domain_for_tenant(tenant1) == item
     else:
         assert get_primary_domain_for_tenant(tenant1) is None
+
+
+def test_get_primary_domain_for_tenant_cached(
+    settings, tenant1, DomainModel, django_assert_num_queries
+):
+    settings.PGSCHEMAS_ROUTING_CACHE_SIZE = 10
+
+    assert get_primary_domain_for_tenant(tenant1) is None
+
+    item = DomainModel.objects.create(tenant=tenant1, domain="tenant1.localhost")
+
+    assert get_primary_domain_for_tenant(tenant1) == item
+
+    with django_assert_num_queries(0):
+        assert get_primary_domain_for_tenant(tenant1) == item
+
+
+def test_get_primary_domains_for_schemas(tenant1, tenant2, DomainModel):
+    item = DomainModel.objects.create(tenant=tenant1, domain="tenant1.localhost")
+    DomainModel.objects.create(tenant=tenant1, domain="tenant1.example.com", is_primary=False)
+
+    with CaptureQueriesContext(connection) as context:
+        primary_domains = get_primary_domains_for_schemas(["tenant1", "tenant2"])
+
+    assert primary_domains == {"tenant1": item}
+    assert len([query for query in context if query["sql"].startswith("SELECT")]) == 1
+
+
+def test_get_primary_domains_for_schemas_chunked(tenant1, tenant2, DomainModel, monkeypatch):
+    monkeypatch.setattr("django_pgschemas.utils.SCHEMA_LOOKUP_CHUNK_SIZE", 1)
+    item1 = DomainModel.objects.create(tenant=tenant1, domain="tenant1.localhost")
+    item2 = DomainModel.objects.create(tenant=tenant2, domain="tenant2.localhost")
+
+    with CaptureQueriesContext(connection) as context:
+        primary_domains = get_primary_domains_for_schemas(["tenant1", "tenant2"])
+
+    assert primary_domains == {"tenant1": item1, "tenant2": item2}
+    assert len([query for query in context if query["sql"].startswith("SELECT")]) == 2
+
+
+def test_resolve_domain_with_many_primary_domains(tenant1, DomainModel):
+    primary1 = DomainModel.objects.create(tenant=tenant1, domain="tenant1.localhost")
+    primary2 = DomainModel.objects.create(tenant=tenant1, domain="tenant1.example.com", folder="x")
+    DomainModel.objects.create(
+        tenant=tenant1, domain="tenant1.redirect.com", is_primary=False, redirect_to_primary=True
+    )
+    DomainModel.objects.filter(pk__in=[primary1.pk, primary2.pk]).update(is_primary=True)
+
+    route = resolve_domain("tenant1.redirect.com", "")
+
+    assert route is not None
+    assert route.primary_domain is not None
+    assert route.primary_domain.pk == primary1.pk
+    assert route.primary_domain.domain == primary1.domain
+    assert route.primary_domain.folder == primary1.folder
+
+
+@pytest.mark.parametrize("reference", ["tenant1", "pk", "unknown", "999999999999"])
+def test_find_tenant_by_reference(tenant1, reference):
+    if reference == "pk":
+        reference = str(tenant1.pk)
+
+    with CaptureQueriesContext(connection) as context:
+        tenant = find_tenant_by_reference(reference)
+
+    sql = next(query["sql"] for query in context if query["sql"].startswith("SELECT"))
+
+    assert "UPPER" not in sql
+    assert "::text" not in sql
+    assert tenant == (None if reference.startswith(("unknown", "9")) else tenant1)
+
+
+def test_find_tenant_by_reference_cached(settings, tenant1, django_assert_num_queries):
+    settings.PGSCHEMAS_ROUTING_CACHE_SIZE = 10
+
+    tenant = find_tenant_by_reference("tenant1")
+
+    with django_assert_num_queries(0):
+        cached_tenant = find_tenant_by_reference("tenant1")
+
+    assert cached_tenant == tenant1
+    assert cached_tenant is not tenant
@@ -1,8 +1,17 @@
+import sys
+from collections import OrderedDict
+
 from django.conf import settings
-from django.urls import reverse
+from django.urls import get_resolver, resolve, reverse
 
+from django_pgschemas.routing import urlresolvers
 from django_pgschemas.routing.info import DomainInfo
-from django_pgschemas.routing.urlresolvers import get_dynamic_tenant_prefixed_urlconf
+from django_pgschemas.routing.urlresolvers import (
+    TenantPrefixPattern,
+    get_dynamic_tenant_prefixed_urlconf,
+    get_folder_urlconf,
+)
+from django_pgschemas.schema import get_default_schema, override
 
 
 def test_no_tenant():
@@ -30,3 +39,68 @@ def test_tenant_with_folder(tenant1):
     tenant1.routing = None
 
     assert url == "/tenant1/profile/"
+
+
+def test_folder_urlconf():
+    urlconf1 = get_folder_urlconf(settings.ROOT_URLCONF, "tenant1")
+    urlconf2 = get_folder_urlconf(settings.ROOT_URLCONF, "tenant2")
+    resolver = get_resolver(urlconf1)
+
+    assert reverse("profile", urlconf=urlconf1) == "/tenant1/profile/"
+    assert reverse("profile", urlconf=urlconf2) == "/tenant2/profile/"
+    assert reverse("profile", urlconf=urlconf1) == "/tenant1/profile/"
+    assert get_folder_urlconf(settings.ROOT_URLCONF, "tenant1") == urlconf1
+    assert get_resolver(urlconf1) is resolver
+
+
+def test_folder_urlconf_cache_size(settings):
+    settings.PGSCHEMAS_FOLDER_URLCONF_CACHE_SIZE = 2
+
+    urlconfs = [get_folder_urlconf(settings.ROOT_URLCONF, f"folder{i}") for i in range(3)]
+
+    assert urlconfs[0] not in sys.modules
+    assert urlconfs[1] in sys.modules
+    assert urlconfs[2] in sys.modules
+    assert reverse("profile", urlconf=get_folder_urlconf(settings.ROOT_URLCONF, "folder0")) == (
+        "/folder0/profile/"
+    )
+
+
+def test_folder_urlconf_evicted_is_rebuilt(settings):
+    settings.PGSCHEMAS_FOLDER_URLCONF_CACHE_SIZE = 2
+
+    urlconf = get_folder_urlconf(settings.ROOT_URLCONF, "evicted")
+    resolver = get_resolver(urlconf)
+    for i in range(4):
+        get_folder_urlconf(settings.ROOT_URLCONF, f"other{i}")
+
+    assert urlconf not in sys.modules
+    assert get_resolver(urlconf) is not resolver
+    assert resolve("/evicted/profile/", urlconf=urlconf).url_name == "profile"
+    assert reverse("profile", urlconf=urlconf) == "/evicted/profile/"
+    assert urlconf in sys.modules
+
+
+def test_folder_urlconf_eviction_keeps_resolvers(settings, monkeypatch):
+    settings.PGSCHEMAS_FOLDER_URLCONF_CACHE_SIZE = 2
+    monkeypatch.setattr(urlresolvers, "_folder_urlconfs", OrderedDict())
+    monkeypatch.setattr(urlresolvers, "_folder_urlconfs_evicted", 0)
+
+    urlconf = get_folder_urlconf(settings.ROOT_URLCONF, "kept")
+    resolver = get_resolver(urlconf)
+    get_folder_urlconf(settings.ROOT_URLCONF, "other")
+    get_folder_urlconf(settings.ROOT_URLCONF, "another")
+
+    assert urlconf not in sys.modules
+    assert get_resolver(urlconf) is resolver
+
+
+def test_tenant_prefix_pattern():
+    pattern = TenantPrefixPattern("tenant1")
+
+    assert pattern.match("tenant1/profile/") == ("profile/", (), {})
+    assert pattern.match("tenant2/profile/") is None
+    assert pattern.regex is TenantPrefixPattern("tenant1").regex
+
+    with override(get_default_schema()):
+        assert TenantPrefixPattern().match("profile/") == ("profile/", (), {})
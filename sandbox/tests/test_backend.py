@@ -0,0 +1,442 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import (
+    DataError,
+    OperationalError,
+    ProgrammingError,
+    connection,
+    connections,
+    transaction,
+)
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+from django.db.models.expressions import RawSQL
+from django.test.utils import CaptureQueriesContext
+
+from django_pgschemas.postgresql.base import PipelinedSearchPathCursor, get_search_path
+from django_pgschemas.schema import Schema
+from sandbox.app_main.models import MainData
+from sandbox.shared_public.models import Catalog
+
+pytestmark = pytest.mark.django_db
+
+requires_psycopg3 = pytest.mark.skipif(not is_psycopg3, reason="Requires psycopg 3")
+
+
+def test_get_search_path(settings):
+    schema = Schema.create("www")
+
+    assert get_search_path(schema) == "www, public"
+    assert get_search_path() == "public"
+
+    settings.PGSCHEMAS_EXTRA_SEARCH_PATHS = ["extensions"]
+
+    assert get_search_path(schema) == "www, public, extensions"
+
+
+def test_search_path_mixed_case_extra_search_paths(settings):
+    settings.PGSCHEMAS_EXTRA_SEARCH_PATHS = ["Mixed_Extensions"]
+
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE SCHEMA mixed_extensions")
+
+    with Schema.create("www"), connection.cursor() as cursor:
+        cursor.execute("SELECT current_schemas(false)")
+
+        assert cursor.fetchone() == (["www", "public", "mixed_extensions"],)
+
+
+@pytest.fixture
+def pipeline_search_path(settings):
+    settings.PGSCHEMAS_PIPELINE_SEARCH_PATH = True
+
+
+@requires_psycopg3
+def test_pipelined_search_path(pipeline_search_path):
+    schema = Schema.create("www")
+
+    with schema, connection.cursor() as cursor:
+        assert isinstance(cursor.cursor, PipelinedSearchPathCursor)
+
+        cursor.execute("SELECT current_setting('search_path')")
+
+        assert cursor.fetchone() == ("www, public",)
+        assert connection._search_path == get_search_path(schema)
+
+
+@requires_psycopg3
+def test_pipelined_search_path_flushed_for_other_statements(pipeline_search_path):
+    with Schema.create("blog"), connection.cursor() as cursor:
+        cursor.execute("SHOW search_path")
+
+        assert cursor.fetchone() == ("blog, public",)
+
+
+@requires_psycopg3
+def test_pipelined_search_path_kept_on_query_error(pipeline_search_path):
+    schema = Schema.create("www")
+
+    with schema:
+        sid = transaction.savepoint()
+
+        with pytest.raises(ProgrammingError), connection.cursor() as cursor:
+            cursor.execute("SELECT * FROM nonexistent_table")
+
+        assert connection._search_path == get_search_path(schema)
+
+        transaction.savepoint_rollback(sid)
+
+
+@requires_psycopg3
+@pytest.mark.django_db(transaction=True)
+def test_pipelined_search_path_forgotten_on_query_error_in_autocommit(
+    pipeline_search_path, settings
+):
+    settings.PGSCHEMAS_LIMIT_SET_CALLS = True
+
+    with Schema.create("www"):
+        with pytest.raises(DataError), connection.cursor() as cursor:
+            cursor.execute("SELECT 1/0")
+
+        assert connection._search_path is None
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT current_schemas(false)")
+
+            assert cursor.fetchone() == (["www", "public"],)
+
+
+def test_pipelined_search_path_disabled():
+    with Schema.create("www"), connection.cursor() as cursor:
+        assert not isinstance(cursor.cursor, PipelinedSearchPathCursor)
+
+
+@pytest.fixture
+def transaction_pooling(settings):
+    settings.PGSCHEMAS_TRANSACTION_POOLING = True
+
+
+def get_session_search_path() -> str:
+    with connection.connection.cursor() as cursor:
+        cursor.execute("SHOW search_path")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_pooling_in_transaction(transaction_pooling):
+    with Schema.create("www"), transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT current_setting('search_path')")
+
+            assert cursor.fetchone() == ("www, public",)
+            assert connection._search_path == "www, public"
+
+    assert connection._search_path is None
+    assert get_session_search_path() != "www, public"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_pooling_in_autocommit(transaction_pooling):
+    with Schema.create("www"), connection.cursor() as cursor:
+        cursor.execute("SELECT current_setting('search_path')")
+
+        assert cursor.fetchone() == ("www, public",)
+        assert connection._search_path is None
+        assert get_session_search_path() != "www, public"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_pooling_in_autocommit_query_error(transaction_pooling):
+    with Schema.create("www"), connection.cursor() as cursor:
+        with pytest.raises(ProgrammingError):
+            cursor.execute("SELECT * FROM nonexistent_table")
+
+        cursor.execute("SELECT 1")
+
+        assert cursor.fetchone() == (1,)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_pooling_non_transactional_statement(transaction_pooling):
+    with Schema.create("www"), connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE INDEX CONCURRENTLY app_main_maindata_concurrently ON app_main_maindata (id)"
+        )
+        cursor.execute(
+            "SELECT schemaname FROM pg_indexes WHERE indexname = 'app_main_maindata_concurrently'"
+        )
+        schemas = cursor.fetchall()
+        cursor.execute("DROP INDEX CONCURRENTLY app_main_maindata_concurrently")
+
+    assert schemas == [("www",)]
+    assert get_session_search_path() != "www, public"
+
+
+class BrokenConnectionCursor:
+    def __enter__(self) -> "BrokenConnectionCursor":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        pass
+
+    def execute(self, sql: str) -> None:
+        if sql == "ROLLBACK":
+            raise OperationalError("connection lost")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_transaction_pooling_rollback_error_keeps_original_error(transaction_pooling):
+    with Schema.create("www"), connection.cursor() as cursor:
+        broken_db = SimpleNamespace(connection=SimpleNamespace(cursor=BrokenConnectionCursor))
+
+        with patch.object(cursor.cursor, "db", broken_db):
+            with pytest.raises(ProgrammingError):
+                cursor.execute("SELECT * FROM nonexistent_table")
+
+
+@pytest.fixture
+def qualified_table_names(settings):
+    settings.PGSCHEMAS_QUALIFIED_TABLE_NAMES = True
+
+
+def search_path_queries(context: CaptureQueriesContext) -> list[str]:
+    return [query["sql"] for query in context if "search_path" in query["sql"]]
+
+
+def test_qualified_table_names(qualified_table_names):
+    with Schema.create("www"):
+        main_sql = str(MainData.objects.all().query)
+        catalog_sql = str(Catalog.objects.filter(pk__in=MainData.objects.values("pk")).query)
+
+    assert 'FROM "www"."app_main_maindata"' in main_sql
+    assert 'FROM "public"."shared_public_catalog"' in catalog_sql
+    assert 'FROM "www"."app_main_maindata"' in catalog_sql
+
+
+def test_qualified_table_names_skip_search_path(qualified_table_names):
+    with Schema.create("www"), CaptureQueriesContext(connection) as context:
+        data = MainData.objects.create()
+        assert MainData.objects.filter(pk=data.pk).exists()
+        MainData.objects.filter(pk=data.pk).delete()
+
+    assert len(context) == 5
+    assert search_path_queries(context) == ["SET search_path = www, public"]
+
+
+def test_qualified_table_names_set_stale_search_path(qualified_table_names):
+    with Schema.create("blog"):
+        connection.cursor().close()
+
+    with Schema.create("www"), CaptureQueriesContext(connection) as context:
+        assert not MainData.objects.exists()
+
+    assert search_path_queries(context) == ["SET search_path = www, public"]
+    assert connection._search_path == get_search_path(Schema.create("www"))
+
+
+def test_qualified_table_names_raw_sql_sets_search_path(qualified_table_names):
+    with Schema.create("www"), CaptureQueriesContext(connection) as context:
+        list(MainData.objects.annotate(total=RawSQL("SELECT COUNT(*) FROM app_main_maindata", [])))
+
+    assert search_path_queries(context) == ["SET search_path = www, public"]
+
+
+def test_qualified_table_names_disabled():
+    with Schema.create("www"):
+        assert 'FROM "app_main_maindata"' in str(MainData.objects.all().query)
+
+
+@pytest.fixture
+def affine_pool():
+    from django_pgschemas.postgresql.pool import SchemaAffinePool
+
+    with SchemaAffinePool(
+        kwargs={**connection.get_connection_params(), "autocommit": True}, min_size=3
+    ) as pool:
+        pool.wait()
+        yield pool
+
+
+@requires_psycopg3
+def test_schema_affine_pool(affine_pool):
+    conn1, conn2, conn3 = [affine_pool.getconn() for _ in range(3)]
+    affine_pool.remember_search_path(conn1, "www, public")
+    affine_pool.remember_search_path(conn2, "blog, public")
+
+    for conn in [conn1, conn2, conn3]:
+        affine_pool.putconn(conn)
+
+    affine_pool.pop_stats()
+
+    with Schema.create("blog"):
+        assert affine_pool.getconn() is conn2
+
+    with Schema.create("tenant1"):
+        assert affine_pool.getconn() is conn1
+
+    stats = affine_pool.get_stats()
+
+    assert stats["affinity_hits"] == 1
+    assert stats["affinity_misses"] == 1
+
+
+@requires_psycopg3
+def test_schema_affine_pool_forgets_rolled_back_connections(affine_pool):
+    conn = affine_pool.getconn()
+    conn.execute("BEGIN")
+    affine_pool.remember_search_path(conn, "www, public")
+    affine_pool.putconn(conn)
+
+    assert affine_pool.get_search_path(conn) is None
+
+
+@requires_psycopg3
+@pytest.mark.parametrize("version", ["3.1.9", "3.4.0"])
+def test_schema_affine_pool_unsupported_version(version, monkeypatch):
+    from django_pgschemas.postgresql.pool import SchemaAffinePool
+
+    monkeypatch.setattr("psycopg_pool.__version__", version)
+
+    with pytest.raises(ImproperlyConfigured, match=version):
+        SchemaAffinePool(kwargs=connection.get_connection_params(), open=False)
+
+
+@requires_psycopg3
+def test_schema_affine_pool_forgets_search_path_with_reset(affine_pool):
+    from django_pgschemas.postgresql.pool import SchemaAffinePool
+
+    pool = SchemaAffinePool(
+        kwargs=connection.get_connection_params(), open=False, reset=lambda conn: None
+    )
+    conn = affine_pool.getconn()
+    pool.remember_search_path(conn, "www, public")
+    affine_pool.putconn(conn)
+
+    assert pool.get_search_path(conn) is None
+
+
+@requires_psycopg3
+def test_schema_affine_pool_built_like_original_pool(settings):
+    from django_pgschemas.postgresql.pool import SchemaAffinePool
+
+    options = {"pool": {"min_size": 2, "max_size": 3, "timeout": 5}}
+    settings_dict = {**connection.settings_dict, "CONN_HEALTH_CHECKS": True, "OPTIONS": options}
+    DatabaseWrapper = type(connections["default"])
+    original = DatabaseWrapper(settings_dict, alias="original").pool
+    settings.PGSCHEMAS_POOL_SCHEMA_AFFINITY = True
+    affine = DatabaseWrapper(settings_dict, alias="affine").pool
+
+    try:
+        assert type(original) is not SchemaAffinePool
+        assert isinstance(affine, SchemaAffinePool)
+        assert DatabaseWrapper(settings_dict, alias="affine").pool is affine
+        for attr in ["kwargs", "min_size", "max_size", "timeout", "closed"]:
+            assert getattr(affine, attr) == getattr(original, attr), attr
+        assert affine._check == original._check
+    finally:
+        original.close()
+        affine.close()
+        DatabaseWrapper._connection_pools.pop("original", None)
+        DatabaseWrapper._connection_pools.pop("affine", None)
+
+
+@requires_psycopg3
+def test_pooled_connection_keeps_search_path(settings):
+    from django_pgschemas.postgresql.pool import SchemaAffinePool
+
+    settings.PGSCHEMAS_POOL_SCHEMA_AFFINITY = True
+    settings.PGSCHEMAS_LIMIT_SET_CALLS = True
+    pooled = type(connections["default"])(
+        {**connection.settings_dict, "OPTIONS": {"pool": {"min_size": 1, "max_size": 1}}},
+        alias="pooled",
+    )
+
+    try:
+        assert isinstance(pooled.pool, SchemaAffinePool)
+        assert pooled.pool.max_size == 1
+
+        with Schema.create("www"):
+            pooled.cursor().close()
+            pooled.close()
+            pooled.ensure_connection()
+
+            assert pooled._search_path == "www, public"
+    finally:
+        pooled.close()
+        pooled.close_pool()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_path_kept_on_rollback_in_autocommit(settings):
+    settings.PGSCHEMAS_LIMIT_SET_CALLS = True
+
+    with Schema.create("blog"), transaction.atomic():
+        connection.cursor().close()
+
+    with Schema.create("www"):
+        connection.cursor().close()
+
+    transaction.rollback()
+
+    assert connection._search_path == "www, public"
+
+    with Schema.create("blog"):
+        connection.cursor().close()
+
+    assert get_session_search_path() == "blog, public"
+
+
+class Rollback(Exception):
+    pass
+
+
+def test_search_path_kept_on_savepoint_rollback(settings):
+    settings.PGSCHEMAS_LIMIT_SET_CALLS = True
+    schema = Schema.create("www")
+
+    with schema:
+        connection.cursor().close()
+
+        with pytest.raises(Rollback), transaction.atomic():
+            connection.cursor().close()
+            raise Rollback
+
+        with CaptureQueriesContext(connection) as context:
+            connection.cursor().close()
+
+    assert connection._search_path == get_search_path(schema)
+    assert search_path_queries(context) == []
+
+
+def test_search_path_restored_on_savepoint_rollback(settings):
+    settings.PGSCHEMAS_LIMIT_SET_CALLS = True
+
+    with Schema.create("blog"):
+        connection.cursor().close()
+
+        with pytest.raises(Rollback), transaction.atomic():
+            with Schema.create("www"):
+                connection.cursor().close()
+            raise Rollback
+
+    assert connection._search_path == get_search_path(Schema.create("blog"))
+    assert get_session_search_path() == "blog, public"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_search_path_kept_on_rollback(settings):
+    settings.PGSCHEMAS_LIMIT_SET_CALLS = True
+    schema = Schema.create("www")
+
+    with schema:
+        connection.cursor().close()
+
+        with pytest.raises(Rollback), transaction.atomic():
+            with Schema.create("blog"):
+                connection.cursor().close()
+            raise Rollback
+
+    assert connection._search_path == get_search_path(schema)
+    assert get_session_search_path() == "www, public"
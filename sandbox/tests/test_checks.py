@@ -133,6 +133,20 @@ class TestEnsureDefaultSchema:
 
         assert str(ctx.value) == f"TENANTS['default'] cannot contain a '{member}' key."
 
+    def test_wildcard_domains(self, tenants_settings):
+        if "default" not in tenants_settings:
+            pytest.skip("default not in tenant settings")
+
+        tenants_settings["default"]["DOMAINS"] = ["*.tenants.localhost"]
+        checks.ensure_default_schemas()
+
+        tenants_settings["default"]["DOMAINS"] = ["*.tenants.localhost", "tenants.localhost"]
+
+        with pytest.raises(ImproperlyConfigured) as ctx:
+            checks.ensure_default_schemas()
+
+        assert str(ctx.value) == "TENANTS['default']['DOMAINS'] can only contain wildcard domains."
+
     @pytest.mark.parametrize(
         "member",
         [
@@ -1,13 +1,19 @@
+import copy
+import pickle
+from contextvars import copy_context
+
 import pytest
 from django.core.exceptions import ValidationError
 from django.template import Context, Template
 
+from django_pgschemas.routing.index import build_static_routing_index
 from django_pgschemas.routing.info import DomainInfo, HeadersInfo, SessionInfo
 from django_pgschemas.schema import (
     Schema,
     deactivate,
     get_current_schema,
     get_default_schema,
+    get_schema_handle,
     override,
     shallow_equal,
 )
@@ -18,6 +24,36 @@ def test_schema_create_rejects_invalid_names():
         Schema.create(schema_name="pg_invalid")
 
 
+def test_schema_create_interned():
+    schema = Schema.create("test1", DomainInfo("domain1"))
+
+    assert Schema.create("test1", DomainInfo("domain1")) is schema
+    assert Schema.create("test1") is not schema
+    assert copy.copy(schema) is schema
+    assert pickle.loads(pickle.dumps(schema)) is schema
+
+
+def test_schema_create_immutable():
+    schema = Schema.create("test1")
+
+    with pytest.raises(AttributeError):
+        schema.routing = SessionInfo("ref1")
+
+    with pytest.raises(AttributeError):
+        schema.extra = True
+
+
+def test_static_schemas_interned(tenants_settings):
+    build_static_routing_index()
+    schema = Schema.create("www", DomainInfo("localhost"))
+
+    get_schema_handle.cache_clear()
+
+    assert Schema.create("www", DomainInfo("localhost")) is schema
+    assert Schema.create("blog") is Schema.create("blog")
+    assert Schema.create("www", HeadersInfo("main")) is Schema.create("www", HeadersInfo("main"))
+
+
 @pytest.mark.parametrize(
     "schema1, schema2, equals",
     [
@@ -124,3 +160,20 @@ def test_schema_is_template_renderable():
     rendered = template.render(context)
 
     assert rendered == "template_schema"
+
+
+def test_class_override_per_context():
+    deactivate()
+
+    schema = Schema.create(schema_name="schema_1")
+
+    def enter():
+        schema.__enter__()
+        return get_current_schema()
+
+    with schema:
+        assert copy_context().run(enter) is schema
+
+        assert get_current_schema() is schema
+
+    assert get_current_schema() is get_default_schema()
@@ -1,8 +1,15 @@
+from contextvars import copy_context
 from unittest.mock import MagicMock
 
 import pytest
 
-from django_pgschemas.schema import Schema, activate, deactivate, get_default_schema
+from django_pgschemas.schema import (
+    Schema,
+    activate,
+    deactivate,
+    defer_activate_signal,
+    get_default_schema,
+)
 from django_pgschemas.signals import schema_activate
 from django_pgschemas.utils import schema_exists
 
@@ -71,6 +78,84 @@ def test_schema_override():
     receiver.assert_called_once_with(signal=schema_activate, sender=Schema, schema=schema)
 
 
+def test_schema_defer_activate_signal():
+    deactivate()
+    schema1 = Schema.create(schema_name="test1")
+    schema2 = Schema.create(schema_name="test2")
+    schema3 = Schema.create(schema_name="test3")
+
+    receiver = MagicMock()
+
+    schema_activate.connect(receiver)
+
+    with defer_activate_signal():
+        for schema in [schema1, schema2, schema1]:
+            with schema:
+                pass
+
+        with defer_activate_signal():
+            activate(schema3)
+
+        receiver.assert_not_called()
+
+        activate(schema2)
+
+    schema_activate.disconnect(receiver)
+
+    receiver.assert_called_once_with(
+        signal=schema_activate, sender=Schema, schema=schema2, schemas=(schema1, schema2, schema3)
+    )
+
+
+def test_schema_defer_activate_signal_unchanged():
+    deactivate()
+    schema = Schema.create(schema_name="test")
+
+    receiver = MagicMock()
+
+    schema_activate.connect(receiver)
+
+    with defer_activate_signal():
+        with schema:
+            pass
+
+    with defer_activate_signal():
+        pass
+
+    schema_activate.disconnect(receiver)
+
+    receiver.assert_called_once_with(
+        signal=schema_activate, sender=Schema, schema=get_default_schema(), schemas=(schema,)
+    )
+
+
+def test_schema_defer_activate_signal_copied_context():
+    deactivate()
+    schema1 = Schema.create(schema_name="test1")
+    schema2 = Schema.create(schema_name="test2")
+
+    receiver = MagicMock()
+
+    schema_activate.connect(receiver)
+
+    with defer_activate_signal():
+        context = copy_context()
+        context.run(activate, schema1)
+        activate(schema2)
+
+    receiver.assert_called_once_with(
+        signal=schema_activate, sender=Schema, schema=schema2, schemas=(schema2,)
+    )
+    receiver.reset_mock()
+
+    # Once the block exits, copied contexts send the signal as usual
+    context.run(activate, schema2)
+
+    schema_activate.disconnect(receiver)
+
+    receiver.assert_called_once_with(signal=schema_activate, sender=Schema, schema=schema2)
+
+
 def test_tenant_delete_callback(TenantModel, db):
     if TenantModel is None:
         pytest.skip("Dynamic tenants are not in use")
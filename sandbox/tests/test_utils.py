@@ -2,6 +2,7 @@ import pytest
 from django.core.exceptions import ValidationError
 from django.db import connection
 from django.db.utils import DatabaseError
+from django.test.utils import CaptureQueriesContext
 
 from django_pgschemas import schema, utils
 
@@ -166,6 +167,31 @@ def test_create_drop_schema(db):
     assert utils.schema_exists("public")  # Schema exists
 
 
+def test_get_missing_schemas(db):
+    assert utils.get_missing_schemas(["public", "missing1", "WWW", "missing2"]) == [
+        "missing1",
+        "missing2",
+    ]
+
+
+def test_create_schemas(db):
+    with CaptureQueriesContext(connection) as context:
+        created = utils.create_schemas(["public", "bulk1", "bulk2", "bulk1"], check_if_exists=True)
+
+    assert created == ["bulk1", "bulk2"]
+    assert len([query for query in context if "search_path" not in query["sql"]]) == 2
+    assert utils.schema_exists("bulk1")
+    assert utils.schema_exists("bulk2")
+    assert utils.create_schemas(["bulk1", "bulk2"], check_if_exists=True) == []
+
+
+def test_create_schemas_rejects_invalid_names(db):
+    with pytest.raises(ValidationError):
+        utils.create_schemas(["bulk1", "pg_invalid"])
+
+    assert not utils.schema_exists("bulk1")
+
+
 def test_clone_schema(db):
     utils._create_clone_schema_function()
 
@@ -194,6 +220,11 @@ def test_create_or_clone_schema(TenantModel, db):
         utils.create_or_clone_schema("www")
 
 
+def test_chunked():
+    assert list(utils.chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(utils.chunked([], 2)) == []
+
+
 @pytest.mark.parametrize(
     "path, expected",
     [